@@ -0,0 +1,29 @@
+"""
+Signals for the blogs app.
+Blog cards are cached by updated_at; bump it when chapters or tags change.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from tools.models import Tag
+from tools.signals import touch_m2m_side
+from tools.utils import touch_updated_at
+from .models import BlogChapter, BlogPost
+
+
+@receiver(post_save, sender=BlogChapter)
+@receiver(post_delete, sender=BlogChapter)
+def touch_post_on_chapter_change(sender, instance, **kwargs):
+    """The card shows the first chapter's image and text."""
+    touch_updated_at(BlogPost.objects.filter(pk=instance.blog_post_id))
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def touch_post_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m_side(BlogPost, 'tags', instance, action, reverse, pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def touch_posts_on_tag_change(sender, instance, **kwargs):
+    touch_updated_at(BlogPost.objects.filter(tags=instance))
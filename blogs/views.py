@@ -1,7 +1,10 @@
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView
 from django.shortcuts import render
+from tools.page_cache import cache_anonymous_page
 from .models import BlogPost
 
+@method_decorator(cache_anonymous_page(BlogPost), name='dispatch')
 class BlogListView(ListView):
     model = BlogPost
     template_name = 'blogs/blog_list.html'
@@ -14,6 +17,7 @@ class BlogListView(ListView):
             return ['blogs/partials/blog_list_rows.html']
         return ['blogs/blog_list.html']
 
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class BlogDetailView(DetailView):
     model = BlogPost
     template_name = 'blogs/blog_detail.html'
@@ -34,6 +34,48 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split(',')
 # API Keys
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
+# LLM transport used by AIService: 'live' calls Gemini, 'record' calls Gemini and
+# saves each response as a fixture, 'replay' serves the fixtures offline.
+LLM_TRANSPORT = os.getenv('LLM_TRANSPORT', 'live')
+LLM_FIXTURES_DIR = BASE_DIR / 'llm_fixtures'
+# Replay latency in ms (unset = latency measured while recording)
+LLM_REPLAY_LATENCY_MS = float(os.environ['LLM_REPLAY_LATENCY_MS']) if os.getenv('LLM_REPLAY_LATENCY_MS') else None
+LLM_REPLAY_JITTER_MS = float(os.getenv('LLM_REPLAY_JITTER_MS', '0'))
+
+# Bulk import taxonomy classifier (kNN over indexed tools). Below the minimum
+# confidence the import falls back to Gemini; set to 1.1 to always use Gemini.
+TAXONOMY_CLASSIFIER_K = 15
+TAXONOMY_CLASSIFIER_MIN_SIMILARITY = 0.35
+TAXONOMY_CLASSIFIER_MIN_NEIGHBORS = 3
+TAXONOMY_CLASSIFIER_MIN_CONFIDENCE = float(os.getenv('TAXONOMY_CLASSIFIER_MIN_CONFIDENCE', '0.5'))
+
+# Analytics event buffer (tools/event_buffer.py): events are written with
+# bulk_create every FLUSH_SIZE events or FLUSH_INTERVAL seconds.
+ANALYTICS_BUFFER_ENABLED = os.getenv('ANALYTICS_BUFFER_ENABLED', 'True') == 'True'
+ANALYTICS_BUFFER_FLUSH_SIZE = 200
+ANALYTICS_BUFFER_FLUSH_INTERVAL = 5  # seconds
+ANALYTICS_BUFFER_MAX_SIZE = 10000  # events beyond this are dropped
+
+# Repeat views of the same object by the same visitor within the window are
+# counted (DailyMetric *_repeat) instead of stored (tools/view_dedupe.py).
+ANALYTICS_DEDUPE_ENABLED = os.getenv('ANALYTICS_DEDUPE_ENABLED', 'True') == 'True'
+ANALYTICS_DEDUPE_WINDOW = 1800  # seconds
+ANALYTICS_DEDUPE_CAPACITY = 100000  # distinct views per window before the false-positive rate rises
+
+# Raw analytics events older than this are moved to gzip JSONL files by archive_analytics
+ANALYTICS_RETENTION_DAYS = int(os.getenv('ANALYTICS_RETENTION_DAYS', '180'))
+ANALYTICS_ARCHIVE_DIR = BASE_DIR / 'analytics_archive'
+
+# In-memory "trending now" counters (tools/trending.py), snapshotted so they survive restarts
+TRENDING_SNAPSHOT_PATH = BASE_DIR / 'db' / 'trending.json'
+TRENDING_SNAPSHOT_INTERVAL = 60  # seconds
+
+# Searches whose embeddings are at least this similar to a cluster's centroid join it (cluster_searches)
+SEARCH_CLUSTER_MIN_SIMILARITY = 0.8
+
+# A click on a search result is attributed to the visitor's search of that query within the window (tools/search_clicks.py)
+SEARCH_CLICK_WINDOW = 1800  # seconds
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -132,6 +174,72 @@ DATABASES = {
     }
 }
 
+# Vector index for semantic search (tools/search.py, robots/search.py)
+CHROMA_DB_PATH = BASE_DIR / 'chroma_db'
+
+# Single mod_wsgi daemon process, so a per-process cache is coherent
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'aijack',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Full pages and their dependency tag versions (tools/page_cache.py). Set PAGE_CACHE_DIR
+    # to keep them on disk instead, e.g. when more than one process serves the site.
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache' if os.getenv('PAGE_CACHE_DIR')
+        else 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.getenv('PAGE_CACHE_DIR', 'aijack-pages'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# Anonymous detail and list pages are served from the 'pages' cache until an object they
+# showed changes; PAGE_CACHE_TIMEOUT bounds everything else (e.g. new related tools)
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Rendered card fragments ({% cache %} in includes/_*_card.html) are keyed by
+# object id + updated_at, so edits show up immediately; this only bounds memory
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Home page hero animation (tools/hero.py): cards pre-rendered per type, resampled after
+# HERO_POOL_MAX_AGE seconds or rebuilt HERO_REBUILD_DELAY seconds after catalog changes
+HERO_POOL_SIZE = 30
+HERO_POOL_MAX_AGE = 60 * 60
+HERO_REBUILD_DELAY = 5
+# False: the home page loads the hero cards from /api/hero/ (cacheable for HERO_API_MAX_AGE seconds)
+HERO_INLINE = os.getenv('HERO_INLINE', 'True') == 'True'
+HERO_API_MAX_AGE = 300
+
+# Home page sections snapshot (tools/home.py): rebuilt HOME_SNAPSHOT_DELAY seconds after catalog
+# changes, at midnight (the cache key is dated) and in the background once older than HOME_SNAPSHOT_MAX_AGE
+HOME_SNAPSHOT_DELAY = 5
+HOME_SNAPSHOT_MAX_AGE = 60 * 60
+
+# Tools browse page served from the in-memory faceted catalog (tools/catalog.py),
+# rebuilt CATALOG_REBUILD_DELAY seconds after catalog changes or after CATALOG_MAX_AGE seconds. False: SQL queries.
+TOOL_CATALOG_IN_MEMORY = os.getenv('TOOL_CATALOG_IN_MEMORY', 'True') == 'True'
+CATALOG_REBUILD_DELAY = 5
+CATALOG_MAX_AGE = 60 * 60
+
+# Tag, profession, professions, stacks, robots and robot company listings (tools/listing.py):
+# LISTING_PAGE_SIZE items per infinite scroll page; anonymous first pages cached LISTING_CACHE_TIMEOUT seconds
+LISTING_PAGE_SIZE = 24
+LISTING_CACHE_TIMEOUT = 60
+
+# Sitemap index and gzipped section files written by generate_sitemaps (tools/sitemap_files.py),
+# served by Apache at /sitemap.xml and /sitemaps/. 50,000 URLs per file is the protocol maximum.
+SITEMAP_DIR = BASE_DIR / 'sitemaps'
+SITEMAP_STATE_PATH = BASE_DIR / 'db' / 'sitemaps.json'
+SITEMAP_MAX_URLS = 10000
+
+# Notification popup payloads (tools/notifications.py), invalidated when a Notification changes;
+# browsers reuse /api/notifications/ for NOTIFICATIONS_MAX_AGE seconds, then revalidate by ETag
+NOTIFICATIONS_CACHE_TIMEOUT = 60 * 60 * 24
+NOTIFICATIONS_MAX_AGE = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
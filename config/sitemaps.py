@@ -0,0 +1,18 @@
+from tools.sitemaps import StaticViewSitemap, ToolSitemap, ProfessionSitemap, StackSitemap, TagSitemap
+from robots.sitemaps import RobotSitemap, RobotCompanySitemap, RobotNewsSitemap, RobotStaticSitemap
+from blogs.sitemaps import BlogSitemap
+
+# Served by /sitemap.xml and written to disk by the generate_sitemaps command
+sitemaps = {
+    'static': StaticViewSitemap,
+    'tools': ToolSitemap,
+    'professions': ProfessionSitemap,
+    'stacks': StackSitemap,
+    'tags': TagSitemap,
+    # Robots sitemaps
+    'robots': RobotSitemap,
+    'robot_companies': RobotCompanySitemap,
+    'robot_news': RobotNewsSitemap,
+    'robot_static': RobotStaticSitemap,
+    'blogs': BlogSitemap,
+}
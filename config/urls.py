@@ -20,23 +20,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.sitemaps.views import sitemap
 from django.views.generic import TemplateView
-from tools.sitemaps import StaticViewSitemap, ToolSitemap, ProfessionSitemap, StackSitemap, TagSitemap
-from robots.sitemaps import RobotSitemap, RobotCompanySitemap, RobotNewsSitemap, RobotStaticSitemap
-from blogs.sitemaps import BlogSitemap
-
-sitemaps = {
-    'static': StaticViewSitemap,
-    'tools': ToolSitemap,
-    'professions': ProfessionSitemap,
-    'stacks': StackSitemap,
-    'tags': TagSitemap,
-    # Robots sitemaps
-    'robots': RobotSitemap,
-    'robot_companies': RobotCompanySitemap,
-    'robot_news': RobotNewsSitemap,
-    'robot_static': RobotStaticSitemap,
-    'blogs': BlogSitemap,
-}
+from config.sitemaps import sitemaps
 
 urlpatterns = [
     path('admin/', admin.site.urls),
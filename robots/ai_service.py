@@ -7,8 +7,9 @@ import json
 import re
 from django.conf import settings
 
+from tools.ai_service import AIService
+
 try:
-    from google import genai
     from google.genai import types
     GENAI_AVAILABLE = True
 except ImportError:
@@ -49,7 +50,7 @@ class RobotAIService:
         Uses Gemini to generate complete robot metadata for bulk import.
         Returns a dictionary with all required fields.
         """
-        if not GENAI_AVAILABLE or not settings.GEMINI_API_KEY:
+        if not GENAI_AVAILABLE or not AIService.llm_available():
             # Fallback response when AI is unavailable
             return {
                 'error': 'No API key configured' if not settings.GEMINI_API_KEY else 'genai not available',
@@ -64,7 +65,7 @@ class RobotAIService:
                 'meta_description': short_description[:160] if short_description else '',
             }
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         system_instruction = """
 You are an expert AI robotics analyst and SEO specialist.
@@ -113,7 +114,7 @@ Generate the complete metadata JSON for this robot. Use search to verify details
 """
 
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-latest",
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
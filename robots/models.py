@@ -11,6 +11,7 @@ This module defines the core models for the AI Robots feature:
 
 import json
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -451,7 +452,7 @@ class RobotView(models.Model):
     session_key = models.CharField(max_length=40, blank=True)
     source_page = models.CharField(max_length=100, default='robot_detail')
     ip_hash = models.CharField(max_length=64, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
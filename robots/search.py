@@ -24,8 +24,7 @@ class RobotSearchService:
         if cls._client is None:
             # Consistent path with tools/search.py
             from django.conf import settings
-            import os
-            db_path = os.path.join(settings.BASE_DIR, 'chroma_db')
+            db_path = str(settings.CHROMA_DB_PATH)
             cls._client = chromadb.PersistentClient(path=db_path)
         return cls._client
     
@@ -5,7 +5,7 @@ Auto-index robots in ChromaDB when saved/deleted.
 
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Robot
+from .models import Robot, RobotCompany
 
 
 @receiver(post_save, sender=Robot)
@@ -32,3 +32,18 @@ def remove_robot_on_delete(sender, instance, **kwargs):
     except Exception:
         # Silently fail if search service is not available
         pass
+
+
+@receiver(post_save, sender=RobotCompany)
+def touch_robots_on_company_change(sender, instance, **kwargs):
+    """Robot cards show the company name and are cached by updated_at."""
+    from tools.utils import touch_updated_at
+    touch_updated_at(Robot.objects.filter(company=instance))
+
+
+@receiver(post_save, sender=Robot)
+@receiver(post_delete, sender=Robot)
+def send_catalog_changed_on_robot_change(sender, **kwargs):
+    """Robot cards are part of the home page hero pool."""
+    from tools.signals import catalog_changed
+    catalog_changed.send(sender=sender)
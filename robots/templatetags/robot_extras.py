@@ -3,19 +3,10 @@ Template tags and filters for the robots app.
 """
 
 from django import template
-from ..models import SavedRobot
 
 register = template.Library()
 
 
-@register.filter
-def is_robot_saved_by(robot, user):
-    """Check if a robot is saved by the given user."""
-    if not user or not user.is_authenticated:
-        return False
-    return SavedRobot.objects.filter(user=user, robot=robot).exists()
-
-
 @register.filter
 def get_spec(specifications, key):
     """Get a specification value from the JSON field."""
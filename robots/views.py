@@ -3,7 +3,6 @@ Views for the robots app.
 Includes public views, admin views, and API endpoints.
 """
 
-import hashlib
 import json
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
@@ -14,24 +13,18 @@ from django.utils import timezone
 from django.contrib import messages
 from django.views.decorators.http import require_POST
 
-from .models import Robot, RobotCompany, RobotNews, RobotView, SavedRobot
+from .models import Robot, RobotCompany, RobotNews, SavedRobot
 from .forms import RobotForm, RobotCompanyForm, RobotNewsForm
-
-
-def get_client_ip(request):
-    """Get client IP from request."""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip or ''
+from tools import saved_items
+from tools.listing import aggregate_counts, get_listing, is_next_page_request, render_listing
+from tools.page_cache import cache_anonymous_page
 
 
 # =============================================================================
 # PUBLIC VIEWS
 # =============================================================================
 
+@cache_anonymous_page(Robot)
 def robots_list(request):
     """Main listing page for all published robots with filters."""
     robots = Robot.objects.filter(status='published').select_related('company')
@@ -42,30 +35,39 @@ def robots_list(request):
     availability = request.GET.get('availability')
     company_slug = request.GET.get('company')
     
-    if robot_type:
-        robots = robots.filter(robot_type=robot_type)
     if target_market:
         robots = robots.filter(target_market=target_market)
     if availability:
         robots = robots.filter(availability=availability)
     if company_slug:
         robots = robots.filter(company__slug=company_slug)
+    # Type counts ignore the type filter; the total is read from them
+    type_base = robots
+    if robot_type:
+        robots = robots.filter(robot_type=robot_type)
+    
+    # Featured robots first
+    robots = robots.order_by('-is_featured', '-created_at', '-id')
+    
+    listing = get_listing(
+        request, 'robots', robots, 'includes/listing/_robot.html',
+        counts=lambda: aggregate_counts(type_base, 'robot_type', [value for value, _ in Robot.TYPE_CHOICES]),
+    )
+    if is_next_page_request(request):
+        return render_listing(request, 'robots/robots.html', {}, listing)
+    counts = listing['counts']
     
     # Get unique companies for filter dropdown
     companies = RobotCompany.objects.annotate(
         published_count=Count('robots', filter=Q(robots__status='published'))
     ).filter(published_count__gt=0).order_by('name')
     
-    # Featured robots first
-    robots = robots.order_by('-is_featured', '-created_at')
-    
     # Latest news for sidebar
     latest_news = RobotNews.objects.filter(is_published=True)[:3]
     
-    return render(request, 'robots/robots.html', {
-        'robots': robots,
+    return render_listing(request, 'robots/robots.html', {
         'companies': companies,
-        'robot_types': Robot.TYPE_CHOICES,
+        'robot_types': [(value, label, counts[value]) for value, label in Robot.TYPE_CHOICES],
         'target_markets': Robot.TARGET_CHOICES,
         'availability_choices': Robot.AVAILABILITY_CHOICES,
         'selected_type': robot_type,
@@ -73,22 +75,15 @@ def robots_list(request):
         'selected_availability': availability,
         'selected_company': company_slug,
         'latest_news': latest_news,
-        'total_count': robots.count(),
-    })
+        'total_count': counts.get(robot_type, 0) if robot_type else counts['all'],
+    }, listing)
 
 
+@cache_anonymous_page()
 def robot_detail(request, slug):
     """Single robot detail page with full information."""
     robot = get_object_or_404(Robot.objects.select_related('company'), slug=slug, status='published')
     
-    # Track view
-    RobotView.objects.create(
-        robot=robot,
-        user=request.user if request.user.is_authenticated else None,
-        session_key=request.session.session_key or '',
-        ip_hash=hashlib.sha256(get_client_ip(request).encode()).hexdigest()[:32]
-    )
-    
     # Related robots (same company or type)
     related_robots = Robot.objects.filter(
         status='published'
@@ -103,9 +98,7 @@ def robot_detail(request, slug):
     related_blog_posts = robot.blog_posts.filter(is_published=True).distinct()
 
     # Check if saved by user
-    is_saved = False
-    if request.user.is_authenticated:
-        is_saved = SavedRobot.objects.filter(user=request.user, robot=robot).exists()
+    is_saved = saved_items.is_saved(request, robot)
     
     return render(request, 'robots/robot_detail.html', {
         'robot': robot,
@@ -127,6 +120,7 @@ def robot_companies(request):
     })
 
 
+@cache_anonymous_page(Robot)
 def robot_company_detail(request, slug):
     """Single company profile page."""
     company = get_object_or_404(RobotCompany, slug=slug)
@@ -134,12 +128,13 @@ def robot_company_detail(request, slug):
     robots = Robot.objects.filter(
         company=company,
         status='published'
-    ).order_by('-is_featured', '-created_at')
+    ).order_by('-is_featured', '-created_at', '-id')
     
-    return render(request, 'robots/robot_company_detail.html', {
+    listing = get_listing(request, 'robot_company', robots, 'includes/listing/_robot.html',
+                          counts=lambda: aggregate_counts(robots))
+    return render_listing(request, 'robots/robot_company_detail.html', {
         'company': company,
-        'robots': robots,
-    })
+    }, listing)
 
 
 def robot_comparison(request):
@@ -253,6 +248,7 @@ def toggle_save_robot(request, robot_id):
         is_saved = False
     else:
         is_saved = True
+    saved_items.mark_saved(request, robot, is_saved)
     
     return JsonResponse({
         'success': True,
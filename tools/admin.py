@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .notifications import invalidate_notifications
 from .models import Category, Profession, Tag, Tool, ToolTranslation, ToolStack, ToolMedia, SavedTool, SavedStack, SearchQuery, AffiliateClick, NewsletterSubscriber, SubmittedTool, ToolReport, Notification
 
 
@@ -285,11 +286,13 @@ class NotificationAdmin(admin.ModelAdmin):
     
     def activate_notifications(self, request, queryset):
         count = queryset.update(is_active=True)
+        invalidate_notifications()  # queryset.update() sends no signals
         self.message_user(request, f"Activated {count} notification(s).")
     activate_notifications.short_description = "Activate selected notifications"
     
     def deactivate_notifications(self, request, queryset):
         count = queryset.update(is_active=False)
+        invalidate_notifications()  # queryset.update() sends no signals
         self.message_user(request, f"Deactivated {count} notification(s).")
     deactivate_notifications.short_description = "Deactivate selected notifications"
 
@@ -3,26 +3,51 @@ from django.db.models import Case, When
 from .search import SearchService
 from .models import Tool, Profession, ToolStack
 import json
-from google import genai
 from google.genai import types
+from .llm_transport import build_transport
+
+# Pricing keywords for imports that skip the LLM. Checked in order.
+PRICING_PATTERNS = {
+    'freemium': ['freemium', 'free tier', 'free plan', 'free version', 'free and paid', 'free + paid'],
+    'paid': ['paid', 'trial', 'subscription', 'per month', '/mo', '$', '€', 'license', 'enterprise'],
+    'free': ['free', 'open source', 'open-source'],
+}
 
 class AIService:
+    _transport = None
+
+    @classmethod
+    def get_transport(cls):
+        """Transport used for every Gemini call (see tools/llm_transport.py)."""
+        if cls._transport is None:
+            cls._transport = build_transport()
+        return cls._transport
+
+    @classmethod
+    def set_transport(cls, transport):
+        """Swap the transport (e.g. replay fixtures in benchmarks)."""
+        cls._transport = transport
+
+    @classmethod
+    def llm_available(cls):
+        return cls.get_transport().is_available()
+
     @staticmethod
     def generate_tool_suggestions(user_prompt):
         """
         Uses Gemini to recommend tools based on user prompt and vector search context.
         Returns a list of Tool objects.
         """
-        if not settings.GEMINI_API_KEY:
+        if not AIService.llm_available():
             # Fallback if no key (for dev/testing without key)
-            print("No GEMINI_API_KEY found. Returning semantic search results directly.")
+            print("No LLM available (GEMINI_API_KEY missing). Returning semantic search results directly.")
             tool_ids = SearchService.search(user_prompt, n_results=5)
             preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(tool_ids)])
             return Tool.objects.filter(id__in=tool_ids).order_by(preserved)
 
         # 1. Semantic Search for Context
         tool_ids = SearchService.search(user_prompt, n_results=15)
-        tools = Tool.objects.filter(id__in=tool_ids).prefetch_related('translations')
+        tools = Tool.objects.filter(id__in=tool_ids).prefetch_related(Tool.prefetch_translations())
         
         if not tools:
             return []
@@ -37,7 +62,7 @@ class AIService:
         context_str = "\n".join(tools_context)
         
         # 3. Call Gemini
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         system_instruction = """
         You are an expert AI software architect.
@@ -63,7 +88,7 @@ class AIService:
         """
 
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-lite-latest", 
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
@@ -103,7 +128,7 @@ class AIService:
         """
         Generates a step-by-step workflow description for a given stack.
         """
-        if not settings.GEMINI_API_KEY:
+        if not AIService.llm_available():
             return "Workflow description unavailable (No API Key)."
         
         # Prepare context
@@ -115,7 +140,7 @@ class AIService:
         
         context_str = "\n".join(tools_context)
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         system_instruction = """
         You are an expert AI software architect.
@@ -137,7 +162,7 @@ class AIService:
         prompt = f"Stack Name: {stack_name}\n\nTools:\n{context_str}"
         
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-lite-latest",
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
@@ -156,7 +181,7 @@ class AIService:
         Uses Gemini to generate complete tool metadata for bulk import.
         Returns a dictionary with all required fields.
         """
-        if not settings.GEMINI_API_KEY:
+        if not AIService.llm_available():
             return {
                 'error': 'No API key configured',
                 'pricing_type': 'freemium',
@@ -170,7 +195,7 @@ class AIService:
                 'cons': ''
             }
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         # Build context with existing entities
         categories_list = ", ".join(existing_categories) if existing_categories else "None yet"
@@ -223,7 +248,7 @@ Generate the complete metadata JSON for this tool. Use search to verify details.
 """
 
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-latest",
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
@@ -288,6 +313,57 @@ Generate the complete metadata JSON for this tool. Use search to verify details.
                 'pros': '',
                 'cons': ''
             }
+
+    @classmethod
+    def map_pricing_text(cls, pricing_text):
+        """Map CSV pricing text to a pricing_type choice."""
+        pricing_lower = (pricing_text or '').lower()
+        for pricing_type, patterns in PRICING_PATTERNS.items():
+            for pattern in patterns:
+                if pattern in pricing_lower:
+                    return pricing_type
+        return 'freemium'
+
+    @staticmethod
+    def suggest_tool_metadata(tool_name, website_url, short_description, long_description,
+                              pricing_text, existing_categories, existing_professions, existing_tags):
+        """
+        Bulk import metadata. Taxonomy comes from the local kNN classifier when it
+        is confident enough; otherwise falls back to generate_tool_metadata (Gemini).
+        Classifier results leave use_cases/pros/cons empty for ai_complete_tool.
+        Adds 'source' ('classifier' or 'llm') and 'confidence' to the result.
+        """
+        from .classifier import TaxonomyClassifier
+
+        confidence = 0.0
+        try:
+            prediction = TaxonomyClassifier.classify(tool_name, short_description, long_description)
+            confidence = prediction['confidence']
+            if confidence >= settings.TAXONOMY_CLASSIFIER_MIN_CONFIDENCE:
+                return {
+                    'source': 'classifier',
+                    'confidence': confidence,
+                    'pricing_type': AIService.map_pricing_text(pricing_text),
+                    'category_names': prediction['category_names'],
+                    'profession_names': prediction['profession_names'],
+                    'tag_names': prediction['tag_names'],
+                    'meta_title': f"{tool_name} - {short_description}"[:60] if short_description else tool_name,
+                    'meta_description': short_description[:160] if short_description else '',
+                    'use_cases': '',
+                    'pros': '',
+                    'cons': ''
+                }
+        except Exception as e:
+            print(f"Taxonomy Classifier Error: {e}")
+
+        metadata = AIService.generate_tool_metadata(
+            tool_name, website_url, short_description, long_description,
+            pricing_text, existing_categories, existing_professions, existing_tags
+        )
+        metadata['source'] = 'llm'
+        metadata['confidence'] = confidence
+        return metadata
+
     @staticmethod
     def complete_tool_fields(tool_data, existing_categories, existing_professions, existing_tags):
         """
@@ -295,10 +371,10 @@ Generate the complete metadata JSON for this tool. Use search to verify details.
         tool_data: dict with current tool information
         Returns: dict with completed fields
         """
-        if not settings.GEMINI_API_KEY:
+        if not AIService.llm_available():
             return {'error': 'No API key configured'}
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         # Build context
         categories_list = ", ".join(existing_categories) if existing_categories else "None yet"
@@ -353,7 +429,7 @@ Complete missing fields and suggest additional relevant items for categories, pr
 """
 
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-latest",
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
@@ -390,10 +466,10 @@ Complete missing fields and suggest additional relevant items for categories, pr
         available_tools: list of tool names available in system
         Returns: dict with completed fields
         """
-        if not settings.GEMINI_API_KEY:
+        if not AIService.llm_available():
             return {'error': 'No API key configured'}
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         # Semantic Search for context
         search_query = f"{stack_data.get('name')} {stack_data.get('description', '')}"
@@ -466,7 +542,7 @@ Complete missing fields. Suggest relevant tools and professions from the provide
 """
 
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-latest",
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
@@ -500,10 +576,10 @@ Complete missing fields. Suggest relevant tools and professions from the provide
         available_stacks: list of stack names available in system
         Returns: dict with completed fields
         """
-        if not settings.GEMINI_API_KEY:
+        if not AIService.llm_available():
             return {'error': 'No API key configured'}
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        transport = AIService.get_transport()
         
         
         # Semantic Search for context
@@ -562,7 +638,7 @@ Complete missing fields. Suggest additional relevant tools and stacks to improve
 """
 
         try:
-            response = client.models.generate_content(
+            response = transport.generate_content(
                 model="gemini-flash-latest",
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
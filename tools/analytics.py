@@ -1,14 +1,37 @@
 """
 Analytics Service for AIJACK
 Handles tracking of searches, tool clicks, and stack views.
+
+Events are queued on the per-process event buffer (tools/event_buffer.py)
+and written in batches, so logging never opens a write transaction on the
+request path. The dashboard getters read the daily rollup tables
+(DailyMetric, DailySearchQuery) filled by the rollup_analytics command.
 """
 import hashlib
+import re
+from urllib.parse import urlparse
+from django.core.cache import cache
 from django.utils import timezone
-from .models import SearchQuery, AffiliateClick, Tool, ToolStack, ToolView, StackView, ProfessionView, Profession
+from .event_buffer import get_event_buffer
+from .view_dedupe import get_view_deduper
+from .search_clicks import get_search_click_queue
+from .trending import get_trending
+from .popularity import get_tool_counters
+from .models import (
+    SearchQuery, AffiliateClick, Tool, ToolStack, ToolView, StackView, ProfessionView, Profession,
+    DailyMetric, DailySearchQuery, DailySketch,
+)
+from .hll import HyperLogLog
 
 
 class AnalyticsService:
     """Service class for tracking user analytics."""
+
+    # Beacon ingestion limits (see views.ingest_events)
+    BEACON_MAX_BYTES = 8192
+    BEACON_MAX_EVENTS = 20
+    BEACON_DEDUPE_SECONDS = 600
+    BOT_USER_AGENT_RE = re.compile(r'bot|crawl|spider|slurp|headless|preview|monitor|curl|wget|python', re.I)
     
     @staticmethod
     def hash_ip(ip_address):
@@ -24,6 +47,49 @@ class AnalyticsService:
         if x_forwarded_for:
             return x_forwarded_for.split(',')[0].strip()
         return request.META.get('REMOTE_ADDR', '')
+
+    @staticmethod
+    def record(event):
+        """Queue an unsaved event instance for a batched write and update the live counters."""
+        get_event_buffer().add(event)
+        get_trending().observe_event(event)
+        get_tool_counters().observe_event(event)
+        return event
+
+    @staticmethod
+    def count_tool_save(tool_id, saved=True):
+        """Add (or remove, on unsave) one save to the tool's popularity counters."""
+        get_tool_counters().add(tool_id, 'total_saves', 1 if saved else -1)
+
+    @staticmethod
+    def is_repeat_view(metric, object_id, session_key, ip_hash):
+        """
+        True if this visitor already viewed the object within the dedupe window.
+        Repeats are only counted (DailyMetric '<metric>_repeat'), not stored as rows.
+        """
+        deduper = get_view_deduper()
+        if deduper is None or not deduper.is_repeat(metric, object_id, session_key or f'ip:{ip_hash}'):
+            return False
+        buffer = get_event_buffer()
+        if not buffer.buffered:
+            buffer.flush()
+        return True
+
+    @staticmethod
+    def get_dedupe_stats():
+        """Checked / suppressed view counters of this process's deduper."""
+        deduper = get_view_deduper()
+        return deduper.get_stats() if deduper else None
+
+    @staticmethod
+    def get_trending(entity, window='hour', limit=10):
+        """Top [(object_id, score)] for 'tool', 'stack' or 'robot' over the last hour or day."""
+        return get_trending().top(entity, window, limit)
+
+    @staticmethod
+    def get_buffer_stats():
+        """Pending / written / dropped counters of this process's event buffer."""
+        return get_event_buffer().get_stats()
     
     @classmethod
     def log_search(cls, request, query, results_count, clicked_tool=None, source_page='search', filters=None):
@@ -41,29 +107,46 @@ class AnalyticsService:
         user = request.user if request.user.is_authenticated else None
         session_key = request.session.session_key or ''
         
-        return SearchQuery.objects.create(
+        return cls.record(SearchQuery(
             query=query[:500],  # Truncate to field max length
             user=user,
             session_key=session_key,
             results_count=results_count,
             clicked_tool=clicked_tool,
             filters_applied=filters or {}
-        )
+        ))
     
+    @classmethod
+    def log_search_click(cls, request, tool, source_page=''):
+        """
+        Attribute a click on a search result to its search (see tools/search_clicks.py).
+        The beacon's source is the search query.
+        """
+        if not source_page:
+            return
+        user = request.user if request.user.is_authenticated else None
+        queue = get_search_click_queue()
+        queue.add(source_page, tool.id, user.id if user else None, request.session.session_key or '')
+        buffer = get_event_buffer()
+        if not buffer.buffered:
+            buffer.flush()
+
     @classmethod
     def log_tool_view(cls, request, tool, source_page='tool_detail'):
         """Log when a user views a tool page."""
         user = request.user if request.user.is_authenticated else None
         session_key = request.session.session_key or ''
         ip_hash = cls.hash_ip(cls.get_client_ip(request))
+        if cls.is_repeat_view('tool_view', tool.id, session_key, ip_hash):
+            return None
         
-        return ToolView.objects.create(
+        return cls.record(ToolView(
             tool=tool,
             user=user,
             session_key=session_key,
             source_page=source_page,
             ip_hash=ip_hash
-        )
+        ))
 
     @classmethod
     def log_affiliate_click(cls, request, tool, source_page='tool_detail'):
@@ -79,7 +162,7 @@ class AnalyticsService:
         session_key = request.session.session_key or ''
         ip_hash = cls.hash_ip(cls.get_client_ip(request))
         
-        return AffiliateClick.objects.create(
+        return cls.record(AffiliateClick(
             tool=tool,
             user=user,
             session_key=session_key,
@@ -87,7 +170,7 @@ class AnalyticsService:
             referrer=request.META.get('HTTP_REFERER', '')[:200],
             user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
             ip_hash=ip_hash
-        )
+        ))
     
     @classmethod
     def log_stack_view(cls, request, stack, source_page='stack_detail'):
@@ -95,14 +178,16 @@ class AnalyticsService:
         user = request.user if request.user.is_authenticated else None
         session_key = request.session.session_key or ''
         ip_hash = cls.hash_ip(cls.get_client_ip(request))
+        if cls.is_repeat_view('stack_view', stack.id, session_key, ip_hash):
+            return None
         
-        return StackView.objects.create(
+        return cls.record(StackView(
             stack=stack,
             user=user,
             session_key=session_key,
             source_page=source_page,
             ip_hash=ip_hash
-        )
+        ))
 
     @classmethod
     def log_profession_view(cls, request, profession, source_page='profession_detail'):
@@ -110,158 +195,253 @@ class AnalyticsService:
         user = request.user if request.user.is_authenticated else None
         session_key = request.session.session_key or ''
         ip_hash = cls.hash_ip(cls.get_client_ip(request))
+        if cls.is_repeat_view('profession_view', profession.id, session_key, ip_hash):
+            return None
         
-        return ProfessionView.objects.create(
+        return cls.record(ProfessionView(
             profession=profession,
             user=user,
             session_key=session_key,
             source_page=source_page,
             ip_hash=ip_hash
-        )
+        ))
+    
+    @classmethod
+    def log_robot_view(cls, request, robot, source_page='robot_detail'):
+        """Log when a user views a robot page."""
+        from robots.models import RobotView
+
+        user = request.user if request.user.is_authenticated else None
+        session_key = request.session.session_key or ''
+        ip_hash = cls.hash_ip(cls.get_client_ip(request))
+        if cls.is_repeat_view('robot_view', robot.id, session_key, ip_hash):
+            return None
+
+        return cls.record(RobotView(
+            robot=robot,
+            user=user,
+            session_key=session_key,
+            source_page=source_page,
+            ip_hash=ip_hash
+        ))
+    
+    @classmethod
+    def is_same_origin(cls, request):
+        """Beacons are csrf-exempt, so only accept them from our own pages."""
+        origin = request.META.get('HTTP_ORIGIN') or request.META.get('HTTP_REFERER', '')
+        if not origin:
+            return False
+        return urlparse(origin).netloc == request.get_host()
+
+    @classmethod
+    def is_bot(cls, request):
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        return not user_agent or bool(cls.BOT_USER_AGENT_RE.search(user_agent))
+
+    @classmethod
+    def beacon_event_types(cls):
+        """type -> (queryset of loggable objects, log method)."""
+        from robots.models import Robot
+
+        return {
+            'tool_view': (Tool.objects.filter(status='published'), cls.log_tool_view),
+            'affiliate_click': (Tool.objects.filter(status='published'), cls.log_affiliate_click),
+            'search_click': (Tool.objects.filter(status='published'), cls.log_search_click),
+            'stack_view': (ToolStack.objects.filter(visibility='public'), cls.log_stack_view),
+            'profession_view': (Profession.objects.all(), cls.log_profession_view),
+            'robot_view': (Robot.objects.filter(status='published'), cls.log_robot_view),
+        }
+
+    @classmethod
+    def log_beacon_events(cls, request, events):
+        """
+        Validate, dedupe and log a batch of beacon events.
+        An event counts once per page view ("pv") within BEACON_DEDUPE_SECONDS,
+        so beacon retries and repeated sends from the same page are ignored.
+        Returns the number of events logged.
+        """
+        if not isinstance(events, list):
+            return 0
+        event_types = cls.beacon_event_types()
+        fallback_pv = cls.hash_ip(cls.get_client_ip(request))
+
+        accepted = {}
+        for event in events[:cls.BEACON_MAX_EVENTS]:
+            if not isinstance(event, dict) or event.get('type') not in event_types:
+                continue
+            try:
+                object_id = int(event.get('id'))
+            except (TypeError, ValueError):
+                continue
+            pv = str(event.get('pv') or fallback_pv)[:64]
+            source = str(event.get('source') or event['type'])[:100]
+            accepted.setdefault((event['type'], object_id, pv), source)
+
+        ids_by_type = {}
+        for event_type, object_id, pv in accepted:
+            ids_by_type.setdefault(event_type, set()).add(object_id)
+        objects_by_type = {
+            event_type: event_types[event_type][0].in_bulk(ids)
+            for event_type, ids in ids_by_type.items()
+        }
+
+        logged = 0
+        for (event_type, object_id, pv), source in accepted.items():
+            obj = objects_by_type[event_type].get(object_id)
+            if obj is None:
+                continue
+            if not cache.add(f'beacon:{event_type}:{object_id}:{pv}', 1, cls.BEACON_DEDUPE_SECONDS):
+                continue
+            event_types[event_type][1](request, obj, source_page=source)
+            logged += 1
+        return logged
     
+    @classmethod
+    def _since_day(cls, days):
+        """First day of a `days` window (today included), for the rollups."""
+        return timezone.localdate() - timezone.timedelta(days=days - 1)
+
+    @classmethod
+    def get_unique_visitors(cls, metric, days=30, object_ids=None):
+        """
+        Approximate distinct visitors per object over the last N days, from the
+        daily HyperLogLog sketches (metric: tool_visitors, stack_visitors, ...).
+        Returns {object_id: count}.
+        """
+        sketches = DailySketch.objects.filter(metric=metric, day__gte=cls._since_day(days))
+        if object_ids is not None:
+            sketches = sketches.filter(object_id__in=object_ids)
+
+        merged = {}
+        for object_id, data in sketches.values_list('object_id', 'sketch'):
+            sketch = HyperLogLog.from_bytes(data)
+            if object_id in merged:
+                merged[object_id].merge(sketch)
+            else:
+                merged[object_id] = sketch
+        return {object_id: sketch.count() for object_id, sketch in merged.items()}
+
+    @classmethod
+    def get_site_unique_visitors(cls, days=30):
+        """Approximate distinct visitors across all tracked pages."""
+        return cls.get_unique_visitors('site_visitors', days=days).get(0, 0)
+
+    @classmethod
+    def _top_from_rollup(cls, model, metric, attr, limit, days, visitors_metric=None):
+        """
+        Top objects by a DailyMetric over the last N days.
+        Returns model instances with the total attached as `attr`, and
+        `unique_visitors` when a visitors_metric is given.
+        """
+        from django.db.models import Sum
+
+        totals = DailyMetric.objects.filter(
+            metric=metric,
+            day__gte=cls._since_day(days)
+        ).values('object_id').annotate(
+            total=Sum('count')
+        ).order_by('-total')[:limit]
+        totals = {row['object_id']: row['total'] for row in totals}
+
+        objects = model.objects.in_bulk(list(totals))
+        visitors = cls.get_unique_visitors(visitors_metric, days, list(totals)) if visitors_metric else {}
+        for object_id, obj in objects.items():
+            setattr(obj, attr, totals[object_id])
+            if visitors_metric:
+                obj.unique_visitors = visitors.get(object_id, 0)
+        return sorted(objects.values(), key=lambda obj: getattr(obj, attr), reverse=True)
+
     @classmethod
     def get_top_clicked_tools(cls, limit=10, days=30):
         """Get most clicked tools in the last N days."""
-        from django.db.models import Count
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        return Tool.objects.filter(
-            affiliate_clicks__clicked_at__gte=since
-        ).annotate(
-            click_count=Count('affiliate_clicks')
-        ).order_by('-click_count')[:limit]
+        return cls._top_from_rollup(Tool, 'tool_click', 'click_count', limit, days)
     
     @classmethod
     def get_top_viewed_stacks(cls, limit=10, days=30):
         """Get most viewed stacks in the last N days."""
-        from django.db.models import Count
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        # Get stack views from SearchQuery
-        stack_views = SearchQuery.objects.filter(
-            query__startswith='[STACK_VIEW]',
-            created_at__gte=since
-        ).values('filters_applied__stack_id').annotate(
-            view_count=Count('id')
-        ).order_by('-view_count')[:limit]
-        
-        # Get actual stack objects
-        stack_ids = [sv['filters_applied__stack_id'] for sv in stack_views if sv['filters_applied__stack_id']]
-        stacks = ToolStack.objects.filter(id__in=stack_ids)
-        
-        # Attach view counts
-        view_counts = {sv['filters_applied__stack_id']: sv['view_count'] for sv in stack_views}
-        for stack in stacks:
-            stack.view_count = view_counts.get(stack.id, 0)
-        
-        return sorted(stacks, key=lambda x: x.view_count, reverse=True)
+        return cls._top_from_rollup(ToolStack, 'stack_view', 'view_count', limit, days, 'stack_visitors')
 
     @classmethod
     def get_top_viewed_tools(cls, limit=10, days=30):
         """Get most viewed tools in the last N days."""
-        from django.db.models import Count
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        return Tool.objects.filter(
-            views__created_at__gte=since
-        ).annotate(
-            view_count=Count('views')
-        ).order_by('-view_count')[:limit]
+        return cls._top_from_rollup(Tool, 'tool_view', 'view_count', limit, days, 'tool_visitors')
     
     @classmethod
     def get_top_viewed_stacks_new(cls, limit=10, days=30):
         """Get most viewed stacks using new StackView model."""
-        from django.db.models import Count
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        return ToolStack.objects.filter(
-            views__created_at__gte=since
-        ).annotate(
-            view_count=Count('views')
-        ).order_by('-view_count')[:limit]
+        return cls.get_top_viewed_stacks(limit=limit, days=days)
 
     @classmethod
     def get_top_clicked_stacks(cls, limit=10, days=30):
         """Get stacks with most tool clicks."""
-        from django.db.models import Count, Sum, Q
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        # We need to sum the clicks of the tools belonging to the stack
-        # This is expensive if not careful. 
-        # Alternative: Count distinct AffiliateClick where tool__stacks=stack
-        
-        return ToolStack.objects.filter(
-            tools__affiliate_clicks__clicked_at__gte=since
-        ).annotate(
-            click_count=Count('tools__affiliate_clicks', filter=Q(tools__affiliate_clicks__clicked_at__gte=since))
-        ).order_by('-click_count')[:limit]
+        return cls._top_from_rollup(ToolStack, 'stack_click', 'click_count', limit, days)
 
     @classmethod
     def get_top_viewed_professions(cls, limit=10, days=30):
         """Get most viewed professions."""
-        from django.db.models import Count
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        return Profession.objects.filter(
-            views__created_at__gte=since
-        ).annotate(
-            view_count=Count('views')
-        ).order_by('-view_count')[:limit]
+        return cls._top_from_rollup(Profession, 'profession_view', 'view_count', limit, days, 'profession_visitors')
 
     @classmethod
     def get_top_clicked_professions(cls, limit=10, days=30):
         """Get professions with most tool clicks."""
-        from django.db.models import Count, Q
-        since = timezone.now() - timezone.timedelta(days=days)
-        
-        return Profession.objects.filter(
-            tools__affiliate_clicks__clicked_at__gte=since
-        ).annotate(
-            click_count=Count('tools__affiliate_clicks', filter=Q(tools__affiliate_clicks__clicked_at__gte=since))
-        ).order_by('-click_count')[:limit]
+        return cls._top_from_rollup(Profession, 'profession_click', 'click_count', limit, days)
+
+    @classmethod
+    def get_top_viewed_robots(cls, limit=10, days=30):
+        """Get most viewed robots."""
+        from robots.models import Robot
+        return cls._top_from_rollup(Robot, 'robot_view', 'view_count', limit, days, 'robot_visitors')
     
+    @staticmethod
+    def get_popular_tools(limit=10):
+        """Most popular published tools by the denormalized, time-decayed score."""
+        return Tool.objects.filter(status='published', popularity__gt=0).order_by('-popularity')[:limit]
+
     @classmethod
     def get_recent_searches(cls, limit=100, days=7):
-        """Get recent search queries."""
+        """Get recent search queries (all of them, unsliced, when limit is None)."""
         since = timezone.now() - timezone.timedelta(days=days)
-        return SearchQuery.objects.filter(
+        queries = SearchQuery.objects.filter(
             created_at__gte=since
         ).exclude(
             query__startswith='[STACK_VIEW]'
-        ).order_by('-created_at')[:limit]
+        ).order_by('-created_at')
+        return queries[:limit] if limit else queries
     
     @classmethod
     def get_search_stats(cls, days=30):
         """Get aggregated search statistics."""
-        from django.db.models import Count, Avg
-        since = timezone.now() - timezone.timedelta(days=days)
+        from django.db.models import Sum
         
-        queries = SearchQuery.objects.filter(
-            created_at__gte=since
-        ).exclude(
-            query__startswith='[STACK_VIEW]'
+        searches = DailySearchQuery.objects.filter(day__gte=cls._since_day(days))
+        totals = searches.aggregate(
+            total=Sum('count'),
+            results=Sum('results_total'),
+            with_clicks=Sum('with_clicks'),
         )
+        total = totals['total'] or 0
         
         return {
-            'total_searches': queries.count(),
-            'unique_queries': queries.values('query').distinct().count(),
-            'avg_results': queries.aggregate(avg=Avg('results_count'))['avg'] or 0,
-            'with_clicks': queries.exclude(clicked_tool=None).count(),
+            'total_searches': total,
+            'unique_queries': searches.values('query').distinct().count(),
+            'avg_results': (totals['results'] or 0) / total if total else 0,
+            'with_clicks': totals['with_clicks'] or 0,
         }
     
     @classmethod
     def get_click_stats(cls, days=30):
         """Get aggregated click statistics."""
-        from django.db.models import Count, Sum
-        since = timezone.now() - timezone.timedelta(days=days)
+        from django.db.models import Sum
         
-        clicks = AffiliateClick.objects.filter(clicked_at__gte=since)
+        metrics = DailyMetric.objects.filter(day__gte=cls._since_day(days))
+        clicks = metrics.filter(metric='tool_click')
+        conversions = metrics.filter(metric='tool_conversion').aggregate(
+            count=Sum('count'), revenue=Sum('value')
+        )
         
         return {
-            'total_clicks': clicks.count(),
-            'unique_tools': clicks.values('tool').distinct().count(),
-            'conversions': clicks.filter(converted=True).count(),
-            'total_revenue': clicks.filter(converted=True).aggregate(
-                total=Sum('conversion_value')
-            )['total'] or 0,
+            'total_clicks': clicks.aggregate(total=Sum('count'))['total'] or 0,
+            'unique_tools': clicks.values('object_id').distinct().count(),
+            'conversions': conversions['count'] or 0,
+            'total_revenue': conversions['revenue'] or 0,
         }
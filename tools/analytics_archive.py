@@ -0,0 +1,159 @@
+"""
+Archival of raw analytics events.
+
+Rows older than a cutoff are streamed into gzip'd JSONL files partitioned by
+table and event date:
+
+    <ANALYTICS_ARCHIVE_DIR>/<table>/<YYYY-MM-DD>.jsonl.gz
+
+and deleted in small id batches, so the SQLite write lock is only held for a
+moment at a time. Archived rows keep their primary keys and can be loaded
+back with restore_table(). Archiving is idempotent: rows whose id is already
+in their day file (restored rows, or a run that crashed before deleting)
+are not written again, only deleted.
+"""
+import gzip
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+def get_archive_tables():
+    """table name -> (model, timestamp field)."""
+    from robots.models import RobotView
+    from .models import AffiliateClick, ProfessionView, SearchQuery, StackView, ToolView
+
+    return {
+        'tool_views': (ToolView, 'created_at'),
+        'stack_views': (StackView, 'created_at'),
+        'profession_views': (ProfessionView, 'created_at'),
+        'robot_views': (RobotView, 'created_at'),
+        'search_queries': (SearchQuery, 'created_at'),
+        'affiliate_clicks': (AffiliateClick, 'clicked_at'),
+    }
+
+
+def get_archive_dir(archive_dir=None):
+    return Path(archive_dir or settings.ANALYTICS_ARCHIVE_DIR)
+
+
+def archive_table(table, cutoff, archive_dir=None, batch_size=500, pause=0.05, dry_run=False):
+    """
+    Move rows of `table` older than `cutoff` (aware datetime) to the archive.
+    Each batch is written (and the files closed) before its rows are deleted.
+    Returns the number of rows newly written to the archive.
+    """
+    model, ts_field = get_archive_tables()[table]
+    table_dir = get_archive_dir(archive_dir) / table
+    queryset = model.objects.filter(**{f'{ts_field}__lt': cutoff}).order_by('id')
+
+    if dry_run:
+        return queryset.count()
+
+    table_dir.mkdir(parents=True, exist_ok=True)
+    archived = 0
+    last_id = 0
+    archived_ids = {}  # day -> ids already in its file, read on first use
+
+    def ids_in_file(day):
+        if day not in archived_ids:
+            path = table_dir / f'{day}.jsonl.gz'
+            archived_ids[day] = set()
+            if path.exists():
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    archived_ids[day] = {json.loads(line)['id'] for line in f if line.strip()}
+        return archived_ids[day]
+
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).values()[:batch_size])
+        if not rows:
+            break
+
+        by_day = defaultdict(list)
+        for row in rows:
+            by_day[row[ts_field].date().isoformat()].append(row)
+
+        # Appending creates a new gzip member per batch; gzip.open reads them all
+        for day, day_rows in by_day.items():
+            present = ids_in_file(day)
+            new_rows = [row for row in day_rows if row['id'] not in present]
+            if new_rows:
+                with gzip.open(table_dir / f'{day}.jsonl.gz', 'at', encoding='utf-8') as f:
+                    for row in new_rows:
+                        f.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+                present.update(row['id'] for row in new_rows)
+            archived += len(new_rows)
+
+        # Only rows that are now in their day file
+        ids = [row['id'] for row in rows if row['id'] in archived_ids[row[ts_field].date().isoformat()]]
+        with transaction.atomic():
+            model.objects.filter(id__in=ids).delete()
+
+        last_id = rows[-1]['id']
+        if pause:
+            time.sleep(pause)
+    return archived
+
+
+def iter_archive_rows(table, start=None, end=None, archive_dir=None):
+    """Yield archived rows (dicts) of `table` for days in [start, end]."""
+    table_dir = get_archive_dir(archive_dir) / table
+    for path in sorted(table_dir.glob('*.jsonl.gz')):
+        day = path.name[:10]
+        if (start and day < start.isoformat()) or (end and day > end.isoformat()):
+            continue
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def restore_table(table, start=None, end=None, archive_dir=None, batch_size=500):
+    """
+    Re-import archived rows. Existing primary keys are skipped, nullable
+    foreign keys to deleted objects are cleared and rows whose required
+    foreign key no longer exists are dropped.
+    Returns (rows written or already present, rows skipped).
+    """
+    model, _ = get_archive_tables()[table]
+    fk_fields = [f for f in model._meta.concrete_fields if f.is_relation]
+    restored = skipped = 0
+
+    def flush(batch):
+        nonlocal restored, skipped
+        for field in fk_fields:
+            wanted = {row[field.attname] for row in batch if row[field.attname] is not None}
+            existing = set(
+                field.related_model._default_manager.filter(pk__in=wanted).values_list('pk', flat=True)
+            ) if wanted else set()
+            kept = []
+            for row in batch:
+                if row[field.attname] is None or row[field.attname] in existing:
+                    kept.append(row)
+                elif field.null:
+                    row[field.attname] = None
+                    kept.append(row)
+                else:
+                    skipped += 1
+            batch = kept
+        model.objects.bulk_create([model(**row) for row in batch], ignore_conflicts=True)
+        restored += len(batch)
+
+    batch = []
+    for row in iter_archive_rows(table, start, end, archive_dir):
+        # JSON turned datetimes/decimals into strings; let the fields parse them back
+        for field in model._meta.concrete_fields:
+            if field.attname in row and not field.is_relation:
+                row[field.attname] = field.to_python(row[field.attname])
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return restored, skipped
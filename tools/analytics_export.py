@@ -0,0 +1,100 @@
+"""
+Streaming CSV / JSONL export of analytics events and newsletter subscribers.
+
+Rows are read in id-ordered chunks (keyset pagination, no OFFSET) and
+encoded one line at a time, optionally through an incremental gzip
+compressor, so exports of any size run in constant memory. Used by the
+admin export view (StreamingHttpResponse) and the export_analytics command.
+"""
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .analytics_archive import get_archive_tables
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def get_export_tables():
+    """table name -> (model, timestamp field): the archived event tables plus subscribers."""
+    from .models import NewsletterSubscriber
+
+    tables = dict(get_archive_tables())
+    tables['newsletter_subscribers'] = (NewsletterSubscriber, 'created_at')
+    return tables
+
+
+def iter_rows(table, start=None, end=None, chunk_size=2000):
+    """
+    Yield (columns, row tuples) for `table`; the first item is the column list.
+    start/end are aware datetimes bounding the table's timestamp field.
+    """
+    model, ts_field = get_export_tables()[table]
+    columns = [field.attname for field in model._meta.concrete_fields]
+    queryset = model.objects.order_by('id')
+    if start:
+        queryset = queryset.filter(**{f'{ts_field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{ts_field}__lt': end})
+
+    yield columns
+    id_index = columns.index('id')
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).values_list(*columns)[:chunk_size])
+        if not rows:
+            break
+        yield from rows
+        last_id = rows[-1][id_index]
+
+
+class _Line:
+    """File-like target for csv.writer that returns the written line."""
+
+    def write(self, value):
+        return value
+
+
+def iter_lines(table, fmt='csv', start=None, end=None):
+    """Yield the export as text lines (CSV with a header row, or one JSON object per line)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    rows = iter_rows(table, start, end)
+    columns = next(rows)
+    if fmt == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def iter_gzip(lines, flush_bytes=64 * 1024):
+    """Compress an iterable of text lines into a stream of gzip chunks."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    buffered = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffered += len(data)
+        chunk = compressor.compress(data)
+        if chunk:
+            yield chunk
+        if buffered >= flush_bytes:
+            # Push partial output so the client keeps receiving data
+            yield compressor.flush(zlib.Z_SYNC_FLUSH)
+            buffered = 0
+    yield compressor.flush()
+
+
+def iter_export(table, fmt='csv', start=None, end=None, compress=False):
+    """Yield the export as str lines, or gzip'd bytes when compress is set."""
+    lines = iter_lines(table, fmt, start, end)
+    return iter_gzip(lines) if compress else lines
+
+
+def export_filename(table, fmt='csv', compress=False):
+    return f"{table}.{fmt}{'.gz' if compress else ''}"
@@ -0,0 +1,182 @@
+"""
+In-memory faceted catalog of published tools for the browse page.
+
+ToolCatalog keeps every published tool (translations and tags prefetched,
+ready for the cards) in one list, and one bitset per facet value: a Python
+int whose bit i is set when tools[i] has that category, profession, pricing
+type or tag. A filter combination is an OR of bitsets within a facet and an
+AND across facets. The count shown next to a facet option is the popcount
+of its bitset ANDed with the filters on the *other* facets, i.e. how many
+tools that option matches (or would add) given the rest of the selection.
+Every browse sort order (tools/pagination.py TOOL_SORTS) is a precomputed
+list of positions, so a page is a walk along it from the cursor, keeping
+the positions whose bit is set.
+
+The catalog is per process, built on first use and rebuilt in the
+background (debounced) after catalog_changed or once older than
+CATALOG_MAX_AGE; the previous catalog keeps serving meanwhile. Cursors are
+the same as for the SQL keyset pagination.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from functools import cmp_to_key
+
+from django.conf import settings
+
+from .models import Category, Profession, Tag, Tool
+from .pagination import TOOL_SORTS, decode_cursor, encode_cursor, get_ordering
+from .utils import DebouncedTask
+
+FACETS = ('category', 'profession', 'pricing', 'tag')
+
+
+class FacetOption:
+    """A dropdown option: slug, name and the number of tools it would leave."""
+
+    def __init__(self, slug, name, facet_count=None):
+        self.slug = slug
+        self.name = name
+        self.facet_count = facet_count
+
+
+def _compare(a, b, ordering):
+    for key, x, y in zip(ordering, a, b):
+        if x != y:
+            result = -1 if x < y else 1
+            return -result if key.startswith('-') else result
+    return 0
+
+
+class ToolCatalog:
+
+    def __init__(self, tools, options):
+        self.tools = tools
+        self.options = options
+        self.built_at = time.monotonic()
+        self.all = (1 << len(tools)) - 1
+
+        self.bits = {facet: defaultdict(int) for facet in FACETS}
+        for i, tool in enumerate(tools):
+            bit = 1 << i
+            for category in tool.categories.all():
+                self.bits['category'][category.slug] |= bit
+            for profession in tool.professions.all():
+                self.bits['profession'][profession.slug] |= bit
+            for tag in tool.tags.all():
+                self.bits['tag'][tag.slug] |= bit
+            self.bits['pricing'][tool.pricing_type] |= bit
+
+        self.orders = {}
+        for ordering in TOOL_SORTS.values():
+            key = cmp_to_key(lambda a, b, ordering=ordering: _compare(a, b, ordering))
+            self.orders[ordering] = sorted(range(len(tools)), key=lambda i: key(self._values(i, ordering)))
+
+    @classmethod
+    def build(cls):
+        tools = list(
+            Tool.objects.filter(status='published')
+            .prefetch_related(Tool.prefetch_translations(), 'tags', 'categories', 'professions')
+        )
+        options = {
+            'category': [FacetOption(slug, name) for slug, name in Category.objects.order_by('name').values_list('slug', 'name')],
+            'profession': [FacetOption(slug, name) for slug, name in Profession.objects.order_by('name').values_list('slug', 'name')],
+            'pricing': [FacetOption(slug, name) for slug, name in Tool.PRICING_CHOICES],
+            'tag': [FacetOption(slug, name) for slug, name in Tag.objects.order_by('name').values_list('slug', 'name')],
+        }
+        return cls(tools, options)
+
+    def _values(self, position, ordering):
+        tool = self.tools[position]
+        return [getattr(tool, key.lstrip('-')) for key in ordering]
+
+    def mask(self, filters, exclude=None):
+        """
+        Bitset of the tools matching `filters` ({facet: [slug, ...]}): any value
+        within a facet (OR), every facet (AND). The `exclude` facet is ignored.
+        """
+        mask = self.all
+        for facet, values in filters.items():
+            if values and facet != exclude:
+                selected = 0
+                for value in values:
+                    selected |= self.bits[facet].get(value, 0)
+                mask &= selected
+        return mask
+
+    def query(self, filters, sort, cursor=None, per_page=20):
+        """
+        One page of matching tools in browse `sort` order after `cursor`.
+        Returns (tools, next_cursor, total matching).
+        """
+        mask = self.mask(filters)
+        ordering = get_ordering(sort)
+        order = self.orders[ordering]
+
+        start = 0
+        values = decode_cursor(cursor, ordering) if cursor else None
+        if values is not None:
+            key = cmp_to_key(lambda a, b: _compare(a, b, ordering))
+            start = bisect_right(order, key(values), key=lambda i: key(self._values(i, ordering)))
+
+        positions = []
+        for position in order[start:]:
+            if mask >> position & 1:
+                positions.append(position)
+                if len(positions) > per_page:
+                    break
+
+        page = [self.tools[position] for position in positions[:per_page]]
+        next_cursor = encode_cursor(page[-1], ordering) if len(positions) > per_page else None
+        return page, next_cursor, mask.bit_count()
+
+    def facet_options(self, filters):
+        """Dropdown options per facet with live counts for the current filters."""
+        result = {}
+        for facet, options in self.options.items():
+            base = self.mask(filters, exclude=facet)
+            bits = self.bits[facet]
+            result[facet] = [
+                FacetOption(option.slug, option.name, (base & bits.get(option.slug, 0)).bit_count())
+                for option in options
+            ]
+        return result
+
+    def option_name(self, facet, slug):
+        for option in self.options[facet]:
+            if option.slug == slug:
+                return option.name
+        return None
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _rebuild():
+    global _catalog
+    _catalog = ToolCatalog.build()
+
+
+# Merges bursts of catalog changes into one rebuild CATALOG_REBUILD_DELAY seconds later
+_rebuild_task = DebouncedTask(_rebuild, lambda: settings.CATALOG_REBUILD_DELAY)
+
+
+def invalidate_tool_catalog():
+    _rebuild_task.schedule()
+
+
+def get_tool_catalog():
+    """The per-process catalog, built on first use; None if it cannot be built."""
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                try:
+                    _rebuild()
+                except Exception as e:
+                    print(f"Tool Catalog Build Error: {e}")
+    elif time.monotonic() - _catalog.built_at > settings.CATALOG_MAX_AGE:
+        # Popularity and other counters change without signals
+        _rebuild_task.schedule()
+    return _catalog
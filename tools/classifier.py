@@ -0,0 +1,109 @@
+"""
+Local taxonomy classifier for bulk import.
+
+Predicts categories, professions and tags for a new tool by kNN voting over
+already-labelled tools in the "tools" vector index, so the LLM only needs to
+be asked when the neighbours disagree.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import Tool
+from .search import SearchService
+
+# Facet -> (M2M field on Tool, max labels to assign). Limits match the LLM prompt.
+FACETS = {
+    'category_names': ('categories', 3),
+    'profession_names': ('professions', 4),
+    'tag_names': ('tags', 6),
+}
+
+
+class TaxonomyClassifier:
+    # A label is assigned when it gets at least this share of the neighbours' vote
+    LABEL_MIN_SHARE = 0.3
+
+    @staticmethod
+    def build_text(name, short_description, long_description=''):
+        """Same shape as the text SearchService.add_tools embeds."""
+        return f"Name: {name}. Description: {short_description} {long_description}."
+
+    @classmethod
+    def find_neighbors(cls, text, k=None):
+        """
+        Return [(tool_id, similarity)] of the k nearest indexed tools.
+        The collection uses cosine distance, so similarity = 1 - distance.
+        """
+        k = k or settings.TAXONOMY_CLASSIFIER_K
+        collection = SearchService.get_collection("tools")
+        count = collection.count()
+        if not count:
+            return []
+
+        results = collection.query(
+            query_embeddings=[SearchService.generate_embedding(text)],
+            n_results=min(k, count),
+            include=['distances'],
+        )
+        ids = results['ids'][0] if results['ids'] else []
+        distances = results['distances'][0] if results['distances'] else []
+        min_similarity = settings.TAXONOMY_CLASSIFIER_MIN_SIMILARITY
+        neighbors = []
+        for tool_id, distance in zip(ids, distances):
+            similarity = 1 - distance
+            if similarity >= min_similarity:
+                neighbors.append((int(tool_id), similarity))
+        return neighbors
+
+    @classmethod
+    def vote(cls, neighbors, field, max_labels):
+        """
+        Similarity-weighted vote over the labels of one facet.
+        Returns (labels, confidence) where confidence is the winning label's
+        share of the vote. Neighbours without any label in the facet abstain.
+        """
+        weights = dict(neighbors)
+        through = getattr(Tool, field).through
+        target = getattr(Tool, field).field.m2m_reverse_field_name()
+        rows = through.objects.filter(tool_id__in=weights).values_list('tool_id', f'{target}__name')
+
+        scores = defaultdict(float)
+        voters = set()
+        for tool_id, label in rows:
+            scores[label] += weights[tool_id]
+            voters.add(tool_id)
+
+        total = sum(weights[tool_id] for tool_id in voters)
+        if not total:
+            return [], 0.0
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        labels = [label for label, score in ranked[:max_labels] if score / total >= cls.LABEL_MIN_SHARE]
+        # Always keep the winner; the confidence tells the caller how much to trust it
+        if not labels:
+            labels = [ranked[0][0]]
+        return labels, ranked[0][1] / total
+
+    @classmethod
+    def classify(cls, name, short_description, long_description=''):
+        """
+        Predict taxonomy for a tool.
+        Returns a dict with the *_names lists, per-facet 'scores', overall
+        'confidence' (lowest facet score, 0 when too few neighbours) and
+        'neighbors' (tool ids, nearest first).
+        """
+        text = cls.build_text(name, short_description, long_description)
+        neighbors = cls.find_neighbors(text)
+
+        result = {'scores': {}, 'neighbors': [tool_id for tool_id, _ in neighbors]}
+        for facet, (field, max_labels) in FACETS.items():
+            labels, score = cls.vote(neighbors, field, max_labels) if neighbors else ([], 0.0)
+            result[facet] = labels
+            result['scores'][facet] = round(score, 3)
+
+        if len(neighbors) < settings.TAXONOMY_CLASSIFIER_MIN_NEIGHBORS:
+            result['confidence'] = 0.0
+        else:
+            result['confidence'] = min(result['scores'].values())
+        return result
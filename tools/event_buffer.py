@@ -0,0 +1,192 @@
+"""
+In-process write buffer for analytics events.
+
+AnalyticsService hands unsaved model instances (ToolView, SearchQuery, ...)
+to the buffer instead of saving them on the request path. A background
+thread writes them with bulk_create when FLUSH_SIZE events are pending or
+every FLUSH_INTERVAL seconds, whichever comes first. Pending events are
+flushed on interpreter shutdown (atexit).
+
+Events are dropped, and counted, when the buffer is full or a flush fails.
+Flush hooks (e.g. view dedupe repeat counters) run after every flush.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class EventBuffer:
+    buffered = True
+
+    def __init__(self, flush_size=200, flush_interval=5, max_size=10000):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+        self._hooks = []
+
+        self.stats = {
+            'written': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'last_flush_at': None,
+            'last_error': None,
+        }
+
+    def add(self, instance):
+        """Queue an unsaved model instance. Returns False if it was dropped."""
+        self._ensure_worker()
+        with self._lock:
+            if len(self._pending) >= self.max_size:
+                self.stats['dropped'] += 1
+                return False
+            self._pending.append(instance)
+            pending = len(self._pending)
+        if pending >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    def add_flush_hook(self, hook):
+        """Call hook() after every flush, from the flushing thread."""
+        self._hooks.append(hook)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self):
+        return dict(self.stats, pending=self.pending_count())
+
+    def flush(self):
+        """Write all pending events and run the flush hooks. Safe to call from any thread."""
+        with self._flush_lock:
+            written = self._write_pending()
+            run_hooks(self._hooks)
+            return written
+
+    def _write_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        by_model = defaultdict(list)
+        for instance in batch:
+            by_model[type(instance)].append(instance)
+
+        written = 0
+        for model, instances in by_model.items():
+            try:
+                model.objects.bulk_create(instances, batch_size=500)
+                written += len(instances)
+            except Exception as e:
+                print(f"Event Buffer Flush Error ({model.__name__}): {e}")
+                self.stats['dropped'] += len(instances)
+                self.stats['last_error'] = f"{model.__name__}: {e}"
+
+        self.stats['written'] += written
+        self.stats['flushes'] += 1
+        self.stats['last_flush_at'] = time.time()
+        return written
+
+    def shutdown(self):
+        """Stop the worker and flush what is left (registered with atexit)."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(); restart the worker in each new process
+        pid = os.getpid()
+        if self._pid == pid and self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                # Events inherited from the parent process belong to the parent
+                self._pending = []
+            self._pid = pid
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='analytics-event-buffer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+class SyncWriter:
+    """Used when ANALYTICS_BUFFER_ENABLED is off: saves each event immediately."""
+    buffered = False
+
+    def __init__(self):
+        self.stats = {'written': 0, 'dropped': 0}
+        self._hooks = []
+
+    def add_flush_hook(self, hook):
+        self._hooks.append(hook)
+
+    def add(self, instance):
+        instance.save()
+        self.stats['written'] += 1
+        return True
+
+    def flush(self):
+        run_hooks(self._hooks)
+        return 0
+
+    def get_stats(self):
+        return dict(self.stats, pending=0)
+
+
+def run_hooks(hooks):
+    for hook in hooks:
+        try:
+            hook()
+        except Exception as e:
+            print(f"Event Buffer Hook Error: {e}")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_event_buffer():
+    """Per-process buffer configured from settings."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if settings.ANALYTICS_BUFFER_ENABLED:
+                    _buffer = EventBuffer(
+                        flush_size=settings.ANALYTICS_BUFFER_FLUSH_SIZE,
+                        flush_interval=settings.ANALYTICS_BUFFER_FLUSH_INTERVAL,
+                        max_size=settings.ANALYTICS_BUFFER_MAX_SIZE,
+                    )
+                    atexit.register(_buffer.shutdown)
+                else:
+                    _buffer = SyncWriter()
+    return _buffer
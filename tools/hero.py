@@ -0,0 +1,147 @@
+"""
+Pre-rendered card pools for the home page hero animation.
+
+A pool holds up to HERO_POOL_SIZE rendered cards per type (tools,
+professions, stacks, robots), sampled from the catalog, and is kept in the
+cache together with the version it was built for. Saving or deleting one of
+those models bumps the version; a stale pool keeps being served while a
+debounced background rebuild replaces it. Each request only picks
+HERO_ITEMS_PER_TYPE cards at random from the cached pool.
+
+Cards are rendered without a request (no favorite or compare buttons), so
+one pool serves every visitor.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .models import Profession, Tool, ToolStack
+from .utils import DebouncedTask
+
+POOL_KEY = 'hero:pool'
+VERSION_KEY = 'hero:version'
+
+HERO_ITEMS_PER_TYPE = 5
+
+
+def _render(template, context):
+    context['hide_actions'] = True
+    return render_to_string(template, context)
+
+
+def _tool_item(tool):
+    trans = tool.get_translation('en')
+    return {
+        'type': 'tool',
+        'name': tool.name,
+        'description': trans.short_description if trans else tool.meta_description or "AI Tool",
+        'html': _render('includes/_tool_card.html', {'tool': tool}),
+    }
+
+
+def _profession_item(profession):
+    return {
+        'type': 'profession',
+        'name': profession.name,
+        'description': profession.hero_tagline or f"AI tools for {profession.name}",
+        'html': _render('includes/_profession_card.html', {'profession': profession}),
+    }
+
+
+def _stack_item(stack):
+    return {
+        'type': 'stack',
+        'name': stack.name,
+        'description': stack.tagline,
+        'html': _render('includes/_stack_card.html', {'stack': stack}),
+    }
+
+
+def _robot_item(robot):
+    return {
+        'type': 'robot',
+        'name': robot.name,
+        'description': robot.short_description,
+        'html': _render('robots/includes/_robot_card.html', {'robot': robot}),
+    }
+
+
+def _sources():
+    from robots.models import Robot
+
+    return {
+        'tools': (
+            Tool.objects.filter(status='published', logo__isnull=False).exclude(logo='')
+                .prefetch_related(Tool.prefetch_translations(), 'tags'),
+            _tool_item,
+        ),
+        'professions': (Profession.objects.exclude(icon=''), _profession_item),
+        'stacks': (ToolStack.objects.filter(visibility='public'), _stack_item),
+        'robots': (
+            Robot.objects.filter(status='published', image__isnull=False).exclude(image='')
+                .select_related('company'),
+            _robot_item,
+        ),
+    }
+
+
+def get_hero_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def build_hero_pool():
+    """Sample and render a new pool and store it for the current version."""
+    version = get_hero_version()
+    pool = {'version': version, 'built_at': time.time()}
+    for name, (queryset, serialize) in _sources().items():
+        ids = list(queryset.values_list('id', flat=True))
+        sample = random.sample(ids, min(len(ids), settings.HERO_POOL_SIZE))
+        pool[name] = [serialize(obj) for obj in queryset.filter(id__in=sample)]
+    cache.set(POOL_KEY, pool, None)
+    return pool
+
+
+# Rebuilds HERO_REBUILD_DELAY seconds after the first request for one; requests in between are merged
+_rebuild = DebouncedTask(build_hero_pool, lambda: settings.HERO_REBUILD_DELAY)
+
+
+def schedule_hero_rebuild():
+    _rebuild.schedule()
+
+
+def invalidate_hero_pool():
+    """Mark the cached pool as stale and schedule its replacement."""
+    cache.set(VERSION_KEY, time.time_ns(), None)
+    schedule_hero_rebuild()
+
+
+def get_hero_pool(rebuild_stale=False):
+    """
+    The cached pool; built inline only when there is none at all (or when it
+    is stale and `rebuild_stale` is set), otherwise rebuilt in the background.
+    """
+    pool = cache.get(POOL_KEY)
+    if pool is None:
+        return build_hero_pool()
+    if pool['version'] != get_hero_version() or time.time() - pool['built_at'] > settings.HERO_POOL_MAX_AGE:
+        if rebuild_stale:
+            return build_hero_pool()
+        schedule_hero_rebuild()
+    return pool
+
+
+def get_hero_data(pool=None):
+    """Random cards per type from the pool, in the shape the home page animation expects."""
+    pool = pool or get_hero_pool()
+    return {
+        name: random.sample(pool.get(name, []), min(len(pool.get(name, [])), HERO_ITEMS_PER_TYPE))
+        for name in ('tools', 'professions', 'stacks', 'robots')
+    }
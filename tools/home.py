@@ -0,0 +1,78 @@
+"""
+Home page snapshot.
+
+All catalog sections on the home page (professions, featured, highlighted
+and new tools and stacks, the global counts and the hero card pool) are
+built together and cached as one object under a key that includes today's
+date, so highlight and "new" windows roll over at midnight on their own.
+The view does a single cache read; catalog changes (tools.signals
+catalog_changed) schedule a debounced rebuild in the background while the
+previous snapshot keeps being served.
+"""
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .hero import get_hero_pool
+from .models import Profession, Tool, ToolStack
+from .utils import DebouncedTask
+
+# Snapshots outlive their day by a little so a rebuild racing midnight does no harm
+SNAPSHOT_TIMEOUT = 60 * 60 * 25
+
+
+def snapshot_key(day):
+    return f'home:snapshot:{day.isoformat()}'
+
+
+def build_home_snapshot(day=None):
+    """Run the home page queries and cache the results for `day` (default: today)."""
+    day = day or date.today()
+    thirty_days_ago = day - timedelta(days=30)
+
+    tools = Tool.objects.filter(status='published').prefetch_related(Tool.prefetch_translations(), 'tags')
+    stacks = ToolStack.objects.filter(visibility='public').prefetch_related('tools', 'professions')
+
+    snapshot = {
+        'built_at': time.time(),
+        'professions': list(Profession.objects.all()[:16]),
+        'featured_stacks': list(stacks.filter(is_featured=True)[:4]),
+        'featured_tools': list(tools.filter(is_featured=True)[:6]),
+        # Highlighted items (within highlight date range)
+        'highlighted_stacks': list(
+            stacks.filter(highlight_start__lte=day, highlight_end__gte=day).order_by('-highlight_start')[:4]
+        ),
+        'highlighted_tools': list(
+            tools.filter(highlight_start__lte=day, highlight_end__gte=day).order_by('-highlight_start')[:6]
+        ),
+        # Newbies (created in last 30 days)
+        'stack_newbies': list(stacks.filter(created_at__gte=thirty_days_ago).order_by('-created_at')[:4]),
+        'app_newbies': list(tools.filter(created_at__gte=thirty_days_ago).order_by('-created_at')[:6]),
+        # Global counts
+        'tool_count': Tool.objects.filter(status='published').count(),
+        'stack_count': ToolStack.objects.filter(visibility='public').count(),
+        'profession_count': Profession.objects.count(),
+        'hero_pool': get_hero_pool(rebuild_stale=True) if settings.HERO_INLINE else None,
+    }
+    cache.set(snapshot_key(day), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+# Merges bursts of catalog changes into one rebuild HOME_SNAPSHOT_DELAY seconds later
+_rebuild = DebouncedTask(build_home_snapshot, lambda: settings.HOME_SNAPSHOT_DELAY)
+
+
+def invalidate_home_snapshot():
+    _rebuild.schedule()
+
+
+def get_home_snapshot():
+    """Today's snapshot (one cache read); built inline only when missing."""
+    snapshot = cache.get(snapshot_key(date.today()))
+    if snapshot is None:
+        return build_home_snapshot()
+    if time.time() - snapshot['built_at'] > settings.HOME_SNAPSHOT_MAX_AGE:
+        _rebuild.schedule()
+    return snapshot
@@ -0,0 +1,93 @@
+"""
+Paginated listings with HTMX infinite scroll.
+
+Used by the professions, profession, tag, stacks, robots and robot company
+pages. A page holds LISTING_PAGE_SIZE objects and is fetched with one extra
+row to know whether there is more, so no COUNT runs per page. Counts a page
+header needs are computed in one query with conditional aggregates
+(aggregate_counts). The next page is requested by HTMX from the same URL
+(?page=N) and rendered with partials/_listing_items.html.
+
+For anonymous visitors the first page (objects and counts) is cached for
+LISTING_CACHE_TIMEOUT seconds, unless the whole page is being rendered for
+the page cache (tools/page_cache.py), which then holds it instead.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.shortcuts import render
+
+from .page_cache import is_collecting
+
+
+def page_number(request):
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except (ValueError, TypeError):
+        return 1
+
+
+def is_next_page_request(request):
+    """HTMX infinite scroll request for a page after the first."""
+    return request.headers.get('HX-Request') == 'true' and page_number(request) > 1
+
+
+def aggregate_counts(queryset, field=None, values=()):
+    """
+    Total and per-value counts in one query:
+    aggregate_counts(tools, 'pricing_type', ['free', 'paid']) -> {'all': 12, 'free': 5, 'paid': 3}
+    """
+    aggregates = {'all': Count('pk')}
+    for value in values:
+        aggregates[value] = Count('pk', filter=Q(**{field: value}))
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def build_listing(request, queryset, item_template, per_page=None, counts=None):
+    per_page = per_page or settings.LISTING_PAGE_SIZE
+    page = page_number(request)
+    offset = (page - 1) * per_page
+    items = list(queryset[offset:offset + per_page + 1])
+    has_more = len(items) > per_page
+
+    next_query = None
+    if has_more:
+        params = request.GET.copy()
+        params['page'] = page + 1
+        next_query = params.urlencode()
+
+    return {
+        'items': items[:per_page],
+        'item_template': item_template,
+        'page': page,
+        'has_more': has_more,
+        'next_query': next_query,
+        # Header counts are only rendered with the full page
+        'counts': counts() if counts and not is_next_page_request(request) else None,
+    }
+
+
+def get_listing(request, name, queryset, item_template, per_page=None, counts=None):
+    """
+    The listing page for this request. `counts` is an optional callable for the
+    page header counts (see aggregate_counts). Anonymous first pages are cached.
+    """
+    # Under the page cache the listed objects must be loaded to be recorded as dependencies
+    if request.user.is_authenticated or page_number(request) != 1 or is_collecting():
+        return build_listing(request, queryset, item_template, per_page, counts)
+
+    key = 'listing:%s:%s' % (name, hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest())
+    listing = cache.get(key)
+    if listing is None:
+        listing = build_listing(request, queryset, item_template, per_page, counts)
+        cache.set(key, listing, settings.LISTING_CACHE_TIMEOUT)
+    return listing
+
+
+def render_listing(request, template_name, context, listing):
+    """Full page, or only the next items for an infinite scroll request."""
+    if is_next_page_request(request):
+        return render(request, 'partials/_listing_items.html', {'listing': listing})
+    return render(request, template_name, {**context, 'listing': listing})
@@ -0,0 +1,200 @@
+"""
+LLM transports for AIService.
+
+Every Gemini call made by AIService / RobotAIService goes through a transport,
+so the AI pipelines can run against recorded responses instead of the live API:
+
+- live:   call Gemini directly (default)
+- record: call Gemini and save every response as a JSON fixture
+- replay: serve saved fixtures offline, with synthetic latency
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    from google import genai
+    GENAI_AVAILABLE = True
+except ImportError:
+    GENAI_AVAILABLE = False
+
+
+class LLMFixtureMissing(Exception):
+    """Raised in replay mode when no recorded fixture can answer a request."""
+
+
+class LLMResponse:
+    """Replayed response. AIService only ever reads `.text`."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def describe_request(model, config, contents):
+    """Return the parts of a generate_content call that identify it."""
+    return {
+        'model': model,
+        'system_instruction': str(getattr(config, 'system_instruction', None) or ''),
+        'response_mime_type': getattr(config, 'response_mime_type', None),
+        'uses_tools': bool(getattr(config, 'tools', None)),
+        'contents': [str(c) for c in contents],
+    }
+
+
+def request_key(request):
+    """Stable hash of the full request (exact fixture match)."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def operation_key(request):
+    """
+    Hash of model + system instruction only.
+    Groups fixtures by pipeline step (metadata, workflow, completion...).
+    """
+    payload = f"{request['model']}\n{request['system_instruction']}"
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+class FixtureStore:
+    """
+    Fixture files live under <root>/<operation_key>/<request_key>.json.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._listing = {}
+        self._cursor = {}
+
+    def path_for(self, request):
+        return self.root / operation_key(request) / f"{request_key(request)}.json"
+
+    def save(self, request, text, latency_ms):
+        path = self.path_for(request)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = dict(request, text=text, latency_ms=round(latency_ms, 1),
+                    recorded_at=timezone.now().isoformat())
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+        with self._lock:
+            self._listing.pop(path.parent.name, None)
+
+    def _load(self, path):
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def find(self, request):
+        """
+        Return (fixture, exact). Falls back to round-robin over fixtures of the
+        same operation when the exact request was never recorded (prompts embed
+        live DB context, so they drift between runs).
+        """
+        path = self.path_for(request)
+        if path.exists():
+            return self._load(path), True
+
+        op = operation_key(request)
+        with self._lock:
+            if op not in self._listing:
+                op_dir = self.root / op
+                self._listing[op] = sorted(op_dir.glob('*.json')) if op_dir.is_dir() else []
+            candidates = self._listing[op]
+            if not candidates:
+                return None, False
+            index = self._cursor.get(op, 0)
+            self._cursor[op] = index + 1
+        return self._load(candidates[index % len(candidates)]), False
+
+
+class LiveTransport:
+    """Calls the Gemini API."""
+    name = 'live'
+
+    def __init__(self):
+        self.stats = {'calls': 0}
+
+    def is_available(self):
+        return GENAI_AVAILABLE and bool(settings.GEMINI_API_KEY)
+
+    def generate_content(self, model, config, contents):
+        self.stats['calls'] += 1
+        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        return client.models.generate_content(model=model, config=config, contents=contents)
+
+
+class RecordingTransport(LiveTransport):
+    """Calls the Gemini API and saves every response as a fixture."""
+    name = 'record'
+
+    def __init__(self, fixtures_dir):
+        super().__init__()
+        self.store = FixtureStore(fixtures_dir)
+        self.stats['recorded'] = 0
+
+    def generate_content(self, model, config, contents):
+        started = time.monotonic()
+        response = super().generate_content(model, config, contents)
+        latency_ms = (time.monotonic() - started) * 1000
+        self.store.save(describe_request(model, config, contents), response.text, latency_ms)
+        self.stats['recorded'] += 1
+        return response
+
+
+class ReplayTransport:
+    """
+    Serves recorded fixtures without network access.
+
+    latency_ms=None sleeps for the latency measured at record time;
+    a number overrides it. jitter_ms adds uniform noise on top.
+    """
+    name = 'replay'
+
+    def __init__(self, fixtures_dir, latency_ms=None, jitter_ms=0):
+        self.store = FixtureStore(fixtures_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stats = {'calls': 0, 'exact': 0, 'fallback': 0, 'missing': 0}
+
+    def is_available(self):
+        return True
+
+    def generate_content(self, model, config, contents):
+        self.stats['calls'] += 1
+        request = describe_request(model, config, contents)
+        fixture, exact = self.store.find(request)
+        if fixture is None:
+            self.stats['missing'] += 1
+            raise LLMFixtureMissing(
+                f"No fixture for operation {operation_key(request)} in {self.store.root}"
+            )
+        self.stats['exact' if exact else 'fallback'] += 1
+
+        delay = self.latency_ms if self.latency_ms is not None else fixture.get('latency_ms', 0)
+        if self.jitter_ms:
+            delay += random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return LLMResponse(fixture['text'])
+
+
+def build_transport(mode=None, fixtures_dir=None, latency_ms=None, jitter_ms=None):
+    """Create a transport from settings, with optional overrides."""
+    mode = mode or settings.LLM_TRANSPORT
+    fixtures_dir = fixtures_dir or settings.LLM_FIXTURES_DIR
+
+    if mode == 'live':
+        return LiveTransport()
+    if mode == 'record':
+        return RecordingTransport(fixtures_dir)
+    if mode == 'replay':
+        if latency_ms is None:
+            latency_ms = settings.LLM_REPLAY_LATENCY_MS
+        if jitter_ms is None:
+            jitter_ms = settings.LLM_REPLAY_JITTER_MS
+        return ReplayTransport(fixtures_dir, latency_ms=latency_ms, jitter_ms=jitter_ms)
+    raise ValueError(f"Unknown LLM transport '{mode}'. Use live, record or replay.")
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tools.analytics_archive import archive_table, get_archive_dir, get_archive_tables
+
+
+class Command(BaseCommand):
+    help = ('Move raw analytics events older than the retention window into gzip JSONL archives '
+            '(one file per table and day) and delete them in small batches. '
+            'Make sure rollup_analytics has covered those days first.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ANALYTICS_RETENTION_DAYS,
+            help=f'Keep events from the last N days (default: {settings.ANALYTICS_RETENTION_DAYS})',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            default=list(get_archive_tables()),
+            help=f'Tables to archive ({", ".join(get_archive_tables())})',
+        )
+        parser.add_argument('--archive-dir', help='Archive directory (default: settings.ANALYTICS_ARCHIVE_DIR)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be archived')
+
+    def handle(self, *args, **options):
+        tables = get_archive_tables()
+        invalid = [t for t in options['tables'] if t not in tables]
+        if invalid:
+            raise CommandError(f'Unknown tables: {invalid}. Choose from: {list(tables)}')
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1.')
+
+        cutoff = timezone.now() - timezone.timedelta(days=options['days'])
+        archive_dir = get_archive_dir(options['archive_dir'])
+        self.stdout.write(f'Archiving events before {cutoff:%Y-%m-%d %H:%M} to {archive_dir}...')
+
+        total = 0
+        for table in options['tables']:
+            count = archive_table(
+                table, cutoff,
+                archive_dir=archive_dir,
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                dry_run=options['dry_run'],
+            )
+            total += count
+            verb = 'Would archive' if options['dry_run'] else 'Archived'
+            self.stdout.write(f'{verb} {count} {table} rows.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total} rows total.'))
@@ -0,0 +1,270 @@
+import json
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from robots.search import RobotSearchService
+from tools.ai_service import AIService
+from tools.event_buffer import get_event_buffer
+from tools.llm_transport import build_transport
+from tools.models import Tool, ToolStack, Profession
+from tools.search import SearchService
+
+SCENARIOS = ['builder', 'bulk_import', 'complete']
+
+BUILDER_PROMPTS = [
+    "I am a freelance video editor working with YouTube creators",
+    "Small marketing agency that needs social media scheduling and analytics",
+    "Solo developer shipping a SaaS product with payments",
+    "Podcast producer who needs transcription and show notes",
+    "Recruiter screening candidates and scheduling interviews",
+]
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the AI pipelines (AI builder, bulk import, ai_complete_*) end-to-end, '
+            'including DB writes and indexing. Uses replayed LLM fixtures by default, so no network is needed. '
+            'Runs against a temporary copy of the database, vector index and media, never the live data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            default=SCENARIOS,
+            help=f'Pipelines to run ({", ".join(SCENARIOS)})',
+        )
+        parser.add_argument('--iterations', type=int, default=10, help='Requests per scenario')
+        parser.add_argument('--rows', type=int, default=5, help='CSV rows per bulk import request')
+        parser.add_argument(
+            '--mode',
+            choices=['replay', 'record', 'live'],
+            default='replay',
+            help='LLM transport (record once with network, then replay offline)',
+        )
+        parser.add_argument('--fixtures-dir', help='Fixture directory (default: settings.LLM_FIXTURES_DIR)')
+        parser.add_argument('--latency-ms', type=float, help='Fixed replay latency (default: recorded latency)')
+        parser.add_argument('--jitter-ms', type=float, help='Random replay jitter')
+        parser.add_argument('--keep', action='store_true', help='Keep the temporary copy for inspection')
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in options['scenarios'] if s in SCENARIOS]
+        if not scenarios:
+            raise CommandError(f'No valid scenarios specified. Choose from: {SCENARIOS}')
+
+        transport = build_transport(
+            mode=options['mode'],
+            fixtures_dir=options['fixtures_dir'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+        )
+        if not transport.is_available():
+            raise CommandError(f"LLM transport '{transport.name}' is not available (GEMINI_API_KEY missing?)")
+
+        self.run_id = uuid.uuid4().hex[:8]
+        workdir = Path(tempfile.mkdtemp(prefix=f'bench-{self.run_id}-'))
+        previous_transport = AIService._transport
+        AIService.set_transport(transport)
+        setup_test_environment()
+        results = {}
+        try:
+            with self._isolated(workdir):
+                self.watermarks = {
+                    model: model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+                    for model in (Tool, ToolStack, Profession)
+                }
+                # Exists only in the temporary database
+                user = get_user_model().objects.create_superuser(
+                    username=f'bench-{self.run_id}',
+                    email=f'bench-{self.run_id}@example.com',
+                    password=uuid.uuid4().hex,
+                )
+                # Count view errors as failed requests instead of aborting the run
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+
+                self.stdout.write(f"Run {self.run_id}: transport={transport.name}, iterations={options['iterations']}")
+                for scenario in scenarios:
+                    self.stdout.write(f'Running {scenario}...')
+                    runner = getattr(self, f'_run_{scenario}')
+                    results[scenario] = runner(client, options)
+        finally:
+            teardown_test_environment()
+            AIService.set_transport(previous_transport)
+            if options['keep']:
+                self.stdout.write(f'Temporary copy kept in {workdir}')
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        self._report(results, transport, options)
+
+    # --- Scenarios ---
+
+    def _timed(self, func):
+        started = time.perf_counter()
+        ok = func()
+        return (time.perf_counter() - started) * 1000, ok
+
+    def _run_builder(self, client, options):
+        """Suggestions (LLM + vector search) followed by saving the stack (LLM workflow + index)."""
+        timings, errors = [], 0
+        for i in range(options['iterations']):
+            prompt = BUILDER_PROMPTS[i % len(BUILDER_PROMPTS)]
+
+            def step():
+                response = client.post(reverse('ai_generate_tools'), data=json.dumps({'prompt': prompt}),
+                                       content_type='application/json')
+                if response.status_code != 200:
+                    return False
+                data = response.json()
+                response = client.post(reverse('create_custom_stack'), {
+                    'name': f"{data.get('title') or 'Bench Stack'} {self.run_id}",
+                    'description': data.get('description', ''),
+                    'visibility': 'private',
+                    'tool_ids': [t['id'] for t in data.get('tools', [])],
+                })
+                return response.status_code == 302
+
+            elapsed, ok = self._timed(step)
+            timings.append(elapsed)
+            errors += 0 if ok else 1
+        return {'timings': timings, 'errors': errors, 'unit': 'stack'}
+
+    def _run_bulk_import(self, client, options):
+        """CSV upload + import (LLM metadata, Tool/taxonomy writes, indexing)."""
+        timings, errors = [], 0
+        rows = options['rows']
+        for i in range(options['iterations']):
+            lines = ['Tool Name;Website URL;Short Description;Detailed Description;Pricing Strategy']
+            for r in range(rows):
+                name = f'Bench Tool {self.run_id} {i}-{r}'
+                lines.append(
+                    f'{name};https://bench-{self.run_id}-{i}-{r}.example.com;'
+                    f'{name} helps teams automate repetitive work;'
+                    f'{name} is a synthetic tool created by the AI pipeline benchmark.;Freemium'
+                )
+            csv_file = SimpleUploadedFile('bench.csv', '\n'.join(lines).encode('utf-8'), content_type='text/csv')
+
+            def step():
+                response = client.post(reverse('bulk_upload_tools'), {'action': 'upload', 'csv_file': csv_file})
+                if response.status_code != 200:
+                    return False
+                response = client.post(reverse('bulk_upload_tools'), {'action': 'import'})
+                return response.status_code == 200
+
+            elapsed, ok = self._timed(step)
+            timings.append(elapsed)
+            errors += 0 if ok else 1
+        return {'timings': timings, 'errors': errors, 'unit': f'import of {rows} rows'}
+
+    def _run_complete(self, client, options):
+        """
+        ai_complete_* endpoints. These overwrite fields, so only objects created
+        by this run (builder / bulk_import scenarios) are targeted.
+        """
+        targets = []
+        for url_name, model in (('ai_complete_tool', Tool), ('ai_complete_stack', ToolStack),
+                                ('ai_complete_profession', Profession)):
+            slugs = model.objects.filter(id__gt=self.watermarks[model]).values_list('slug', flat=True)[:5]
+            targets += [(url_name, slug) for slug in slugs]
+        if not targets:
+            self.stdout.write(self.style.WARNING(
+                'No objects created by this run to complete. Run it together with builder or bulk_import.'
+            ))
+            return {'timings': [], 'errors': 0, 'unit': 'completion'}
+
+        timings, errors = [], 0
+        for i in range(options['iterations']):
+            url_name, slug = targets[i % len(targets)]
+            elapsed, ok = self._timed(
+                lambda: client.post(reverse(url_name, args=[slug])).status_code == 200
+            )
+            timings.append(elapsed)
+            errors += 0 if ok else 1
+        return {'timings': timings, 'errors': errors, 'unit': 'completion'}
+
+    # --- Isolation ---
+
+    @contextmanager
+    def _isolated(self, workdir):
+        """
+        Point the database, vector index and media at copies in `workdir`.
+        SQLite is copied with the backup API (consistent while the site writes);
+        other backends get an empty test database.
+        """
+        chroma_path = workdir / 'chroma_db'
+        if Path(settings.CHROMA_DB_PATH).exists():
+            shutil.copytree(settings.CHROMA_DB_PATH, chroma_path)
+
+        get_event_buffer().flush()
+        original_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            db_path = workdir / 'db.sqlite3'
+            source, target = sqlite3.connect(original_name), sqlite3.connect(db_path)
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+            connection.close()
+            connection.settings_dict['NAME'] = str(db_path)
+        else:
+            self.stdout.write(self.style.WARNING('Not SQLite: running against an empty test database.'))
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            with override_settings(CHROMA_DB_PATH=chroma_path, MEDIA_ROOT=workdir / 'media'):
+                self._reset_search_clients()
+                try:
+                    yield
+                finally:
+                    # Events logged by the benchmark belong to the copy
+                    get_event_buffer().flush()
+        finally:
+            self._reset_search_clients()
+            if connection.vendor == 'sqlite':
+                connection.close()
+                connection.settings_dict['NAME'] = original_name
+            else:
+                connection.creation.destroy_test_db(original_name, verbosity=0)
+
+    def _reset_search_clients(self):
+        SearchService._client = None
+        RobotSearchService._client = None
+
+    # --- Report ---
+
+    def _report(self, results, transport, options):
+        self.stdout.write('')
+        self.stdout.write(f"{'scenario':<14}{'n':>5}{'err':>5}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for scenario, result in results.items():
+            timings = sorted(result['timings'])
+            if not timings:
+                continue
+            total_s = sum(timings) / 1000
+            p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+            self.stdout.write(
+                f"{scenario:<14}{len(timings):>5}{result['errors']:>5}"
+                f"{len(timings) / total_s:>9.2f}{statistics.median(timings):>10.1f}{p95:>10.1f}{timings[-1]:>10.1f}"
+                f"  (per {result['unit']})"
+            )
+        self.stdout.write('')
+        self.stdout.write(f'Transport stats: {transport.stats}')
+        if transport.stats.get('missing'):
+            self.stdout.write(self.style.WARNING(
+                'Some requests had no fixture. Record them first with --mode record.'
+            ))
+        self.stdout.write(self.style.SUCCESS('Benchmark complete.'))
@@ -0,0 +1,125 @@
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from tools.catalog import get_tool_catalog
+from tools.models import Category, Profession, Tag
+
+ENGINES = ['sql', 'catalog']
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the tools browse page and infinite scroll with heavy multi-select filter '
+            'combinations: queries and timings per request, for the SQL (EXISTS) and in-memory catalog paths.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', default=ENGINES, help=f'Paths to run ({", ".join(ENGINES)})')
+        parser.add_argument('--iterations', type=int, default=20, help='Requests per combination')
+        parser.add_argument('--values', type=int, default=3, help='Values selected per multi-select facet')
+
+    def handle(self, *args, **options):
+        engines = [engine for engine in options['engines'] if engine in ENGINES]
+        if not engines:
+            raise CommandError(f'No valid engines specified. Choose from: {ENGINES}')
+
+        combinations = self._combinations(options['values'])
+        if not combinations:
+            raise CommandError('No categories, professions or tags with published tools to filter by.')
+
+        setup_test_environment()
+        client = Client(raise_request_exception=False)
+        results = []
+        try:
+            for engine in engines:
+                with override_settings(TOOL_CATALOG_IN_MEMORY=engine == 'catalog'):
+                    if engine == 'catalog':
+                        get_tool_catalog()  # build outside the timings
+                    for name, params in combinations:
+                        results.append((engine, name, self._run(client, params, options['iterations'])))
+        finally:
+            teardown_test_environment()
+
+        self._report(results)
+
+    def _top_slugs(self, model, limit):
+        """The facet values with the most published tools (the heaviest filters)."""
+        return list(
+            model.objects.annotate(n=Count('tools', filter=Q(tools__status='published')))
+            .filter(n__gt=0).order_by('-n').values_list('slug', flat=True)[:limit]
+        )
+
+    def _combinations(self, values):
+        categories = self._top_slugs(Category, values)
+        professions = self._top_slugs(Profession, values)
+        tags = self._top_slugs(Tag, values)
+
+        combinations = [('no filters', {})]
+        if categories:
+            combinations.append(('1 category', {'category': categories[:1]}))
+            combinations.append((f'{len(categories)} categories', {'category': categories}))
+        if categories and professions:
+            combinations.append(('categories x professions', {'category': categories, 'profession': professions}))
+        if categories and professions and tags:
+            combinations.append(('all facets', {
+                'category': categories, 'profession': professions, 'tag': tags, 'pricing': ['free', 'freemium'],
+            }))
+            combinations.append(('all facets, popular', {
+                'category': categories, 'profession': professions, 'tag': tags, 'sort': 'popular',
+            }))
+        return combinations if len(combinations) > 1 else []
+
+    def _request(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = (time.perf_counter() - started) * 1000
+        return response, elapsed, len(queries)
+
+    def _run(self, client, params, iterations):
+        """First page (browse_tools) and the next page (browse_tools_api, by cursor)."""
+        query = urlencode(params, doseq=True)
+        page_timings, scroll_timings = [], []
+        page_queries = scroll_queries = errors = 0
+        for _ in range(iterations):
+            response, elapsed, page_queries = self._request(client, f"{reverse('browse_tools')}?{query}")
+            page_timings.append(elapsed)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            cursor = response.context['next_cursor'] if response.context else None
+            if cursor:
+                response, elapsed, scroll_queries = self._request(
+                    client, f"{reverse('browse_tools_api')}?{urlencode({'cursor': cursor})}&{query}"
+                )
+                scroll_timings.append(elapsed)
+                errors += response.status_code != 200
+        return {
+            'page': page_timings, 'page_queries': page_queries,
+            'scroll': scroll_timings, 'scroll_queries': scroll_queries, 'errors': errors,
+        }
+
+    def _report(self, results):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'engine':<9}{'filters':<26}{'err':>4}{'q/page':>8}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'q/scroll':>10}{'p50 ms':>9}{'p95 ms':>9}"
+        )
+        for engine, name, result in results:
+            line = f"{engine:<9}{name:<26}{result['errors']:>4}"
+            for key in ('page', 'scroll'):
+                timings = sorted(result[key])
+                if timings:
+                    p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+                    line += f"{result[key + '_queries']:>{8 if key == 'page' else 10}}{statistics.median(timings):>9.1f}{p95:>9.1f}"
+                else:
+                    line += f"{'-':>{8 if key == 'page' else 10}}{'-':>9}{'-':>9}"
+            self.stdout.write(line)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete.'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from tools.search_clusters import cluster_new_searches, reset_clusters
+
+
+class Command(BaseCommand):
+    help = ('Group new search queries into intent clusters (normalized text + embedding similarity) '
+            'and update their search / zero-result / click counts for the content gaps report. '
+            'Incremental: only searches logged since the last run are read.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Searches read per batch')
+        parser.add_argument('--min-similarity', type=float, help='Override SEARCH_CLUSTER_MIN_SIMILARITY')
+        parser.add_argument('--no-embeddings', action='store_true', help='Group by normalized text only')
+        parser.add_argument('--reset', action='store_true', help='Drop all clusters and recluster every search')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_clusters()
+            self.stdout.write(self.style.WARNING('Clusters dropped; reclustering all searches.'))
+
+        processed, changed = cluster_new_searches(
+            batch_size=options['batch_size'],
+            use_embeddings=not options['no_embeddings'],
+            min_similarity=options['min_similarity'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} searches, {changed} cluster updates.'))
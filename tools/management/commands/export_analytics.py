@@ -0,0 +1,54 @@
+import sys
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tools.analytics_export import EXPORT_FORMATS, get_export_tables, iter_export
+
+
+class Command(BaseCommand):
+    help = ('Stream an analytics table (or the newsletter subscribers) to CSV or JSONL, '
+            'optionally gzip\'d, in constant memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', help=f'Table to export ({", ".join(get_export_tables())})')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help='Output format (default: csv)')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+        parser.add_argument('--days', type=int, help='Only rows from the last N days')
+        parser.add_argument('--start', help='First day to export (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to export (YYYY-MM-DD)')
+
+    def parse_day(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date: {value} (expected YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        table = options['table']
+        if table not in get_export_tables():
+            raise CommandError(f'Unknown table: {table}. Choose from: {list(get_export_tables())}')
+
+        start = end = None
+        if options['days']:
+            start = timezone.now() - timedelta(days=options['days'])
+        if options['start']:
+            start = timezone.make_aware(datetime.combine(self.parse_day(options['start']), time.min))
+        if options['end']:
+            end = timezone.make_aware(datetime.combine(self.parse_day(options['end']) + timedelta(days=1), time.min))
+
+        chunks = iter_export(table, options['format'], start, end, compress=options['gzip'])
+        if options['output']:
+            mode = 'wb' if options['gzip'] else 'w'
+            encoding = None if options['gzip'] else 'utf-8'
+            with open(options['output'], mode, encoding=encoding, newline='' if encoding else None) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'Exported {table} to {options["output"]}'))
+        else:
+            out = sys.stdout.buffer if options['gzip'] else sys.stdout
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
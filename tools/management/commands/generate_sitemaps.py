@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.sitemaps import sitemaps
+from tools.sitemap_files import write_sitemaps
+
+
+class Command(BaseCommand):
+    help = ('Write the sitemap index and gzipped, size-capped section files to SITEMAP_DIR for Apache to serve. '
+            'Incremental: only sections whose rows changed since the last run are rewritten (run it from cron).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sections',
+            nargs='+',
+            help=f'Only consider these sections ({", ".join(sitemaps)}); the index keeps the others',
+        )
+        parser.add_argument('--force', action='store_true', help='Rewrite every section')
+
+    def handle(self, *args, **options):
+        if options['sections']:
+            invalid = [s for s in options['sections'] if s not in sitemaps]
+            if invalid:
+                raise CommandError(f'Unknown sections: {invalid}. Choose from: {list(sitemaps)}')
+
+        changed = write_sitemaps(sitemaps, only=options['sections'], force=options['force'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f'Done. {len(changed)} section(s) rewritten.'))
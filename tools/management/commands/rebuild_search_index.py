@@ -36,7 +36,7 @@ class Command(BaseCommand):
 
         if 'tools' in target_models:
             self.stdout.write('Indexing tools...')
-            tools = Tool.objects.filter(status='published').prefetch_related('translations', 'tags')
+            tools = Tool.objects.filter(status='published').prefetch_related(Tool.prefetch_translations(), 'tags')
             count = SearchService.add_tools(tools)
             self.stdout.write(self.style.SUCCESS(f'Indexed {count} tools.'))
 
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from tools.models import Category, Profession, Tool, ToolStack
+
+MODELS = {
+    'tools': Tool,
+    'stacks': ToolStack,
+    'professions': Profession,
+    'categories': Category,
+}
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the stored JSON-LD (schema and breadcrumb) for tools, stacks, professions and categories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            default=list(MODELS),
+            help=f'Specify which models to refresh ({", ".join(MODELS)})',
+        )
+
+    def handle(self, *args, **options):
+        target_models = [m for m in options['models'] if m in MODELS]
+
+        if not target_models:
+            self.stdout.write(self.style.ERROR(f'No valid models specified. Choose from: {set(MODELS)}'))
+            return
+
+        for name in target_models:
+            self.stdout.write(f'Refreshing {name}...')
+            count = 0
+            for obj in MODELS[name].structured_data_queryset().iterator(chunk_size=200):
+                obj.refresh_structured_data()
+                count += 1
+            self.stdout.write(self.style.SUCCESS(f'Refreshed {count} {name}.'))
@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tools.analytics_archive import get_archive_dir, get_archive_tables, restore_table
+
+
+class Command(BaseCommand):
+    help = ('Re-import archived analytics events (written by archive_analytics) for ad-hoc analysis. '
+            'Rows already in the database are skipped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('tables', nargs='+', help=f'Tables to restore ({", ".join(get_archive_tables())})')
+        parser.add_argument('--from', dest='start', help='First day to restore (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', help='Last day to restore (YYYY-MM-DD)')
+        parser.add_argument('--archive-dir', help='Archive directory (default: settings.ANALYTICS_ARCHIVE_DIR)')
+
+    def handle(self, *args, **options):
+        tables = get_archive_tables()
+        invalid = [t for t in options['tables'] if t not in tables]
+        if invalid:
+            raise CommandError(f'Unknown tables: {invalid}. Choose from: {list(tables)}')
+
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        archive_dir = get_archive_dir(options['archive_dir'])
+        for table in options['tables']:
+            restored, skipped = restore_table(table, start, end, archive_dir=archive_dir)
+            self.stdout.write(f'{table}: {restored} rows restored, {skipped} skipped (deleted objects).')
+
+        self.stdout.write(self.style.SUCCESS('Restore complete. Re-run rollup_analytics for the restored days if needed.'))
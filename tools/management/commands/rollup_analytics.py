@@ -0,0 +1,189 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from tools.hll import HyperLogLog
+from tools.popularity import recount_totals, refresh_popularity
+from tools.models import (
+    AffiliateClick, DailyMetric, DailySearchQuery, DailySketch, Profession, ProfessionView,
+    SearchQuery, StackView, ToolStack, ToolView,
+)
+
+# Metrics computed (and therefore replaced) by this command
+ROLLUP_METRICS = [
+    'tool_view', 'tool_click', 'tool_conversion', 'stack_view', 'stack_click',
+    'profession_view', 'profession_click', 'robot_view',
+]
+
+
+class Command(BaseCommand):
+    help = ('Roll up raw analytics events (views, clicks, searches) into per-day tables '
+            'read by the admin dashboard. Run it periodically, e.g. every 15 minutes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Number of days to (re)compute, counting today (default: 2 = today and yesterday)',
+        )
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Also reset the tool view/click/save totals from the rollups (e.g. after a deploy or crash)',
+        )
+        parser.add_argument(
+            '--include-archived',
+            action='store_true',
+            help='Also recompute days past ANALYTICS_RETENTION_DAYS (only after restore_analytics brought their events back)',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        days = max(options['days'], 1)
+        # Raw events of these days may already be archived: rebuilding them would replace real rollups with zeros
+        archived_until = today - timedelta(days=settings.ANALYTICS_RETENTION_DAYS)
+        rolled_up = 0
+
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            if day <= archived_until and not options['include_archived']:
+                self.stdout.write(self.style.WARNING(
+                    f'{day}: skipped, past the retention window (use --include-archived after restoring its events)'
+                ))
+                continue
+            metrics, searches = self.rollup_day(day)
+            sketches = self.sketch_day(day)
+            self.stdout.write(f'{day}: {metrics} metric rows, {searches} search rows, {sketches} sketches')
+            rolled_up += 1
+
+        self.stdout.write(f'Popularity: {refresh_popularity(today)} tools updated')
+        if options['recount']:
+            self.stdout.write(f'Totals: {recount_totals()} tools recounted')
+
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {rolled_up} day(s).'))
+
+    def day_range(self, day):
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return start, start + timedelta(days=1)
+
+    def rollup_day(self, day):
+        """Recompute all rollup rows of one day. Returns (metric rows, search rows)."""
+        start, end = self.day_range(day)
+
+        rows = []
+
+        def add(metric, queryset, value_field=None):
+            for item in queryset:
+                rows.append(DailyMetric(
+                    day=day,
+                    metric=metric,
+                    object_id=item['object_id'],
+                    count=item['count'],
+                    value=(item.get(value_field) or 0) if value_field else 0,
+                ))
+
+        tool_views = ToolView.objects.filter(created_at__gte=start, created_at__lt=end)
+        add('tool_view', tool_views.values(object_id=F('tool_id')).annotate(count=Count('id')))
+
+        clicks = AffiliateClick.objects.filter(clicked_at__gte=start, clicked_at__lt=end)
+        add('tool_click', clicks.values(object_id=F('tool_id')).annotate(count=Count('id')))
+        add('tool_conversion', clicks.filter(converted=True).values(object_id=F('tool_id')).annotate(
+            count=Count('id'), revenue=Sum('conversion_value')
+        ), value_field='revenue')
+
+        stack_views = StackView.objects.filter(created_at__gte=start, created_at__lt=end)
+        add('stack_view', stack_views.values(object_id=F('stack_id')).annotate(count=Count('id')))
+
+        profession_views = ProfessionView.objects.filter(created_at__gte=start, created_at__lt=end)
+        add('profession_view', profession_views.values(object_id=F('profession_id')).annotate(count=Count('id')))
+
+        # Clicks on tools belonging to a stack / profession (membership as of rollup time)
+        click_filter = Q(tools__affiliate_clicks__clicked_at__gte=start, tools__affiliate_clicks__clicked_at__lt=end)
+        add('stack_click', ToolStack.objects.filter(click_filter).values(object_id=F('id')).annotate(
+            count=Count('tools__affiliate_clicks', filter=click_filter)
+        ))
+        add('profession_click', Profession.objects.filter(click_filter).values(object_id=F('id')).annotate(
+            count=Count('tools__affiliate_clicks', filter=click_filter)
+        ))
+
+        try:
+            from robots.models import RobotView
+            robot_views = RobotView.objects.filter(created_at__gte=start, created_at__lt=end)
+            add('robot_view', robot_views.values(object_id=F('robot_id')).annotate(count=Count('id')))
+        except ImportError:
+            pass
+
+        searches = SearchQuery.objects.filter(
+            created_at__gte=start, created_at__lt=end
+        ).exclude(
+            query__startswith='[STACK_VIEW]'
+        ).values('query').annotate(
+            count=Count('id'),
+            results_total=Sum('results_count'),
+            with_clicks=Count('id', filter=Q(clicked_tool__isnull=False)),
+        )
+        search_rows = [
+            DailySearchQuery(
+                day=day,
+                query=item['query'],
+                count=item['count'],
+                results_total=item['results_total'] or 0,
+                with_clicks=item['with_clicks'],
+            )
+            for item in searches
+        ]
+
+        with transaction.atomic():
+            DailyMetric.objects.filter(day=day, metric__in=ROLLUP_METRICS).delete()
+            DailyMetric.objects.bulk_create(rows, batch_size=500)
+            DailySearchQuery.objects.filter(day=day).delete()
+            DailySearchQuery.objects.bulk_create(search_rows, batch_size=500)
+
+        return len(rows), len(search_rows)
+
+    def sketch_day(self, day):
+        """
+        Rebuild the unique-visitor HyperLogLog sketches of one day.
+        A visitor is identified by session key, or hashed IP without a session.
+        Returns the number of sketches written.
+        """
+        start, end = self.day_range(day)
+        sources = [
+            ('tool_visitors', ToolView, 'tool_id', 'created_at'),
+            ('tool_visitors', AffiliateClick, 'tool_id', 'clicked_at'),
+            ('stack_visitors', StackView, 'stack_id', 'created_at'),
+            ('profession_visitors', ProfessionView, 'profession_id', 'created_at'),
+        ]
+        try:
+            from robots.models import RobotView
+            sources.append(('robot_visitors', RobotView, 'robot_id', 'created_at'))
+        except ImportError:
+            pass
+
+        sketches = {}
+        site = sketches[('site_visitors', 0)] = HyperLogLog()
+        for metric, model, object_field, ts_field in sources:
+            rows = model.objects.filter(
+                **{f'{ts_field}__gte': start, f'{ts_field}__lt': end}
+            ).values_list(object_field, 'session_key', 'ip_hash').order_by().iterator(chunk_size=2000)
+            for object_id, session_key, ip_hash in rows:
+                visitor = session_key or f'ip:{ip_hash}'
+                key = (metric, object_id)
+                if key not in sketches:
+                    sketches[key] = HyperLogLog()
+                sketches[key].add(visitor)
+                site.add(visitor)
+
+        rows = [
+            DailySketch(day=day, metric=metric, object_id=object_id, sketch=sketch.to_bytes())
+            for (metric, object_id), sketch in sketches.items()
+        ]
+        with transaction.atomic():
+            DailySketch.objects.filter(day=day).delete()
+            DailySketch.objects.bulk_create(rows, batch_size=200)
+        return len(rows)
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import json
 from django.utils.html import strip_tags
 
@@ -24,6 +25,9 @@ class SEOModel(models.Model):
         blank=True, 
         help_text="Override canonical URL if needed (e.g., for syndicated content)."
     )
+    # JSON-LD stored by refresh_structured_data() when the object or its relations change (tools/signals.py)
+    schema_ld = models.TextField(blank=True, editable=False)
+    breadcrumb_ld = models.TextField(blank=True, editable=False)
 
     class Meta:
         abstract = True
@@ -38,6 +42,28 @@ class SEOModel(models.Model):
         """Override this in subclasses to return specific Schema.org JSON."""
         return "{}"
 
+    def get_breadcrumb_json(self):
+        """Override this in subclasses to return a BreadcrumbList JSON."""
+        return "{}"
+
+    def get_schema_ld(self):
+        """Stored schema JSON for templates; generated on the fly until it has been stored."""
+        return self.schema_ld or self.get_schema_json()
+
+    def get_breadcrumb_ld(self):
+        return self.breadcrumb_ld or self.get_breadcrumb_json()
+
+    @classmethod
+    def structured_data_queryset(cls):
+        """Rows with what get_schema_json() reads prefetched."""
+        return cls.objects.all()
+
+    def refresh_structured_data(self):
+        """Regenerate and store the JSON-LD (queryset update: no save signals, updated_at unchanged)."""
+        self.schema_ld = self.get_schema_json()
+        self.breadcrumb_ld = self.get_breadcrumb_json()
+        type(self).objects.filter(pk=self.pk).update(schema_ld=self.schema_ld, breadcrumb_ld=self.breadcrumb_ld)
+
 
 class Category(SEOModel):
     """Hierarchical category for tools (e.g., Construction -> Design -> BIM)."""
@@ -186,25 +212,51 @@ class Tool(SEOModel):
     # Highlight period
     highlight_start = models.DateField(null=True, blank=True, help_text="Start date of highlight period")
     highlight_end = models.DateField(null=True, blank=True, help_text="End date of highlight period")
+
+    # Denormalized popularity counters (tools/popularity.py), read by search ranking and "popular" sorting
+    total_views = models.PositiveIntegerField(default=0)
+    total_clicks = models.PositiveIntegerField(default=0)
+    total_saves = models.PositiveIntegerField(default=0)
+    popularity = models.FloatField(default=0, db_index=True, help_text="Time-decayed score, refreshed by rollup_analytics")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-is_featured', '-created_at']
+        # Browse keyset pagination (tools/pagination.py TOOL_SORTS)
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['status', 'name', 'id']),
+            models.Index(fields=['status', 'is_featured', 'created_at', 'id']),
+        ]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def prefetch_translations(*languages):
+        """
+        Prefetch only the translations a page needs (English is always included):
+        Tool.objects.prefetch_related(Tool.prefetch_translations(lang))
+        """
+        return models.Prefetch(
+            'translations',
+            queryset=ToolTranslation.objects.filter(language__in={'en', *languages}),
+        )
+
     def get_translation(self, lang='en'):
-        """Get translation for a specific language, fallback to English."""
-        try:
-            return self.translations.get(language=lang)
-        except ToolTranslation.DoesNotExist:
-            try:
-                return self.translations.get(language='en')
-            except ToolTranslation.DoesNotExist:
-                return None
+        """
+        Get translation for a specific language, fallback to English.
+        Resolved from prefetched translations when present (see
+        prefetch_translations), otherwise with one query.
+        """
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('translations')
+        if prefetched is not None:
+            by_language = {trans.language: trans for trans in prefetched}
+        else:
+            by_language = {trans.language: trans for trans in self.translations.filter(language__in={lang, 'en'})}
+        return by_language.get(lang) or by_language.get('en')
     
     def get_seo_description(self):
         if self.meta_description:
@@ -245,8 +297,9 @@ class Tool(SEOModel):
             data["offers"]["priceValidUntil"] = "2099-12-31"
         
         # Add categories as keywords
-        if self.categories.exists():
-            data["keywords"] = ", ".join([c.name for c in self.categories.all()])
+        categories = [c.name for c in self.categories.all()]
+        if categories:
+            data["keywords"] = ", ".join(categories)
         
         return json.dumps(data)
 
@@ -297,6 +350,10 @@ class Tool(SEOModel):
         
         return missing
 
+    @classmethod
+    def structured_data_queryset(cls):
+        return cls.objects.prefetch_related(cls.prefetch_translations(), 'categories')
+
 
 class ToolTranslation(models.Model):
     """Multilingual content for Tool."""
@@ -358,6 +415,7 @@ class ToolStack(SEOModel):
     highlight_end = models.DateField(null=True, blank=True, help_text="End date of highlight period")
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-is_featured', '-created_at']
@@ -370,7 +428,7 @@ class ToolStack(SEOModel):
 
     def get_schema_json(self):
         """Generate HowTo schema for workflow stacks."""
-        tools_list = list(self.tools.all())
+        tools_list = list(self.tools.prefetch_related(Tool.prefetch_translations()))
         
         # Build HowToStep from tools
         steps = []
@@ -494,7 +552,7 @@ class ToolView(models.Model):
     session_key = models.CharField(max_length=40, blank=True)
     source_page = models.CharField(max_length=100, default='tool_detail')
     ip_hash = models.CharField(max_length=64, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -510,7 +568,7 @@ class StackView(models.Model):
     session_key = models.CharField(max_length=40, blank=True)
     source_page = models.CharField(max_length=100, default='stack_detail')
     ip_hash = models.CharField(max_length=64, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -526,7 +584,7 @@ class ProfessionView(models.Model):
     session_key = models.CharField(max_length=40, blank=True)
     source_page = models.CharField(max_length=100, default='profession_detail')
     ip_hash = models.CharField(max_length=64, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -542,7 +600,7 @@ class SearchQuery(models.Model):
     session_key = models.CharField(max_length=40, blank=True, help_text="Anonymous session tracking")
     results_count = models.PositiveIntegerField(default=0)
     clicked_tool = models.ForeignKey(Tool, on_delete=models.SET_NULL, null=True, blank=True, related_name='search_clicks')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
     
     # Search context
     source_page = models.CharField(max_length=100, default='U/N', help_text="Page where search was initiated")
@@ -569,7 +627,7 @@ class AffiliateClick(models.Model):
     ip_hash = models.CharField(max_length=64, blank=True, help_text="Hashed IP for fraud detection")
     
     # Timestamps
-    clicked_at = models.DateTimeField(auto_now_add=True)
+    clicked_at = models.DateTimeField(default=timezone.now)
     
     # Conversion tracking (updated via webhook or manual)
     converted = models.BooleanField(default=False)
@@ -584,6 +642,131 @@ class AffiliateClick(models.Model):
         return f"{status} {self.tool.name} click @ {self.clicked_at.strftime('%Y-%m-%d %H:%M')}"
 
 
+class DailyMetric(models.Model):
+    """
+    Analytics rollup: one row per day, metric and object.
+    Filled by the rollup_analytics command from the raw event tables.
+    """
+    METRIC_CHOICES = [
+        ('tool_view', 'Tool Views'),
+        ('tool_click', 'Tool Clicks'),
+        ('tool_conversion', 'Tool Conversions'),
+        ('stack_view', 'Stack Views'),
+        ('stack_click', 'Stack Tool Clicks'),
+        ('profession_view', 'Profession Views'),
+        ('profession_click', 'Profession Tool Clicks'),
+        ('robot_view', 'Robot Views'),
+        # Views suppressed by the short-window dedupe (tools/view_dedupe.py)
+        ('tool_view_repeat', 'Tool Repeat Views'),
+        ('stack_view_repeat', 'Stack Repeat Views'),
+        ('profession_view_repeat', 'Profession Repeat Views'),
+        ('robot_view_repeat', 'Robot Repeat Views'),
+    ]
+
+    day = models.DateField()
+    metric = models.CharField(max_length=40, choices=METRIC_CHOICES)
+    object_id = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    value = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Summed value (e.g. conversion revenue)")
+
+    class Meta:
+        ordering = ['-day', 'metric']
+        unique_together = ['day', 'metric', 'object_id']
+        indexes = [models.Index(fields=['metric', 'day'])]
+
+    def __str__(self):
+        return f"{self.day} {self.metric} #{self.object_id}: {self.count}"
+
+
+class DailySearchQuery(models.Model):
+    """Analytics rollup: searches per day and query text."""
+    day = models.DateField()
+    query = models.CharField(max_length=500)
+    count = models.PositiveIntegerField(default=0)
+    results_total = models.PositiveIntegerField(default=0, help_text="Sum of results_count, for averages")
+    with_clicks = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day', '-count']
+        unique_together = ['day', 'query']
+
+    def __str__(self):
+        return f"{self.day} '{self.query}': {self.count}"
+
+
+class DailySketch(models.Model):
+    """
+    Analytics rollup: HyperLogLog sketch of distinct visitors per day and object
+    (see tools/hll.py). object_id 0 holds the site-wide sketch of a metric.
+    """
+    METRIC_CHOICES = [
+        ('tool_visitors', 'Tool Visitors'),
+        ('stack_visitors', 'Stack Visitors'),
+        ('profession_visitors', 'Profession Visitors'),
+        ('robot_visitors', 'Robot Visitors'),
+        ('site_visitors', 'Site Visitors'),
+    ]
+
+    day = models.DateField()
+    metric = models.CharField(max_length=40, choices=METRIC_CHOICES)
+    object_id = models.PositiveIntegerField()
+    sketch = models.BinaryField()
+
+    class Meta:
+        ordering = ['-day', 'metric']
+        unique_together = ['day', 'metric', 'object_id']
+        indexes = [models.Index(fields=['metric', 'day'])]
+
+    def __str__(self):
+        return f"{self.day} {self.metric} #{self.object_id}"
+
+
+class SearchCluster(models.Model):
+    """
+    Analytics rollup: searches grouped by intent. Queries are normalized and
+    merged by embedding similarity; filled incrementally by cluster_searches
+    (see tools/search_clusters.py).
+    """
+    label = models.CharField(max_length=500, help_text="Most frequent query of the cluster")
+    variants = models.JSONField(default=dict, help_text="Normalized query -> searches (most frequent only)")
+    centroid = models.BinaryField(null=True, blank=True, help_text="Mean query embedding (float32)")
+    search_count = models.PositiveIntegerField(default=0)
+    zero_result_count = models.PositiveIntegerField(default=0)
+    click_count = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-zero_result_count', '-search_count']
+        indexes = [models.Index(fields=['-zero_result_count']), models.Index(fields=['-search_count'])]
+
+    def __str__(self):
+        return f"{self.label} ({self.search_count})"
+
+    @property
+    def zero_result_rate(self):
+        return self.zero_result_count / self.search_count if self.search_count else 0
+
+    @property
+    def click_through_rate(self):
+        return self.click_count / self.search_count if self.search_count else 0
+
+    def top_variants(self, limit=6):
+        """[(query, searches)] of the most frequent variants other than the label."""
+        variants = sorted(self.variants.items(), key=lambda item: item[1], reverse=True)
+        return [item for item in variants if item[0] != self.label][:limit]
+
+
+class JobCheckpoint(models.Model):
+    """Progress of an incremental job: the last source row id it processed."""
+    name = models.CharField(max_length=100, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
 class NewsletterSubscriber(models.Model):
     """Newsletter subscriber email."""
     email = models.EmailField(unique=True)
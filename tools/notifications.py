@@ -0,0 +1,77 @@
+"""
+Cached payloads for the notification popups (/api/notifications/).
+
+There are two variants: public notifications for anonymous visitors and
+public + auth_only ones for signed-in users. Each is serialized once and
+cached under the current version together with its ETag; saving or deleting
+a Notification (or the admin bulk actions) bumps the version.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Notification
+
+VERSION_KEY = 'notifications:version'
+
+VISIBILITIES = {
+    'public': ['public'],
+    'auth_only': ['public', 'auth_only'],
+}
+
+
+def youtube_id(url):
+    """Video id from the common YouTube URL formats, or None."""
+    if not url:
+        return None
+    if 'v=' in url:
+        return url.split('v=')[1].split('&')[0]
+    if 'youtu.be/' in url:
+        return url.split('youtu.be/')[1].split('?')[0]
+    return None
+
+
+def get_notifications_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate_notifications():
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def build_notifications_payload(visibility):
+    """Serialized JSON body and its ETag for one visibility variant."""
+    # Order: permanent first, then by priority (desc), then by created_at (desc)
+    notifications = Notification.objects.filter(
+        is_active=True, visibility__in=VISIBILITIES[visibility]
+    ).order_by('-notification_type', '-priority', '-created_at')
+
+    data = [{
+        'id': n.id,
+        'title': n.title,
+        'content': n.content,
+        'notification_type': n.notification_type,
+        'priority': n.priority,
+        'youtube_id': youtube_id(n.youtube_url),
+    } for n in notifications]
+
+    body = json.dumps({'notifications': data})
+    return {'body': body, 'etag': '"%s"' % hashlib.md5(body.encode('utf-8')).hexdigest()}
+
+
+def get_notifications_payload(visibility):
+    """The cached payload for `visibility` ('public' or 'auth_only')."""
+    key = f'notifications:{visibility}:{get_notifications_version()}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_notifications_payload(visibility)
+        cache.set(key, payload, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+    return payload
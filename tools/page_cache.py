@@ -0,0 +1,193 @@
+"""
+Full-page cache for anonymous GET requests, invalidated by dependency tags.
+
+While a decorated view renders, every instance of a TRACKED_MODELS model
+that gets loaded (post_init) is recorded as a tag ("tools.tool:12"); the
+view can also depend on whole models ("tools.tool"), which list pages do
+so new rows show up. The page is stored together with the current version
+of each tag. Saving or deleting an instance (or changing its m2m links, or
+a child row from CHILD_MODELS) sets a new version on its tag and on its
+model tag, so exactly the pages that showed it become stale; a hit compares
+the stored versions with the current ones in one get_many. PAGE_CACHE_TIMEOUT
+bounds what tags cannot see (rows that would newly appear in a detail page's
+related lists, queryset.update() counters). Objects must come from the
+database while collecting: unpickled ones send no post_init, so other
+caches are bypassed then (see tools/listing.py).
+
+Only requests without a session, messages or HTMX headers are cached, so
+every cached page is the plain anonymous page. Pages carry no CSRF token of
+their own: JavaScript sends the csrftoken cookie as X-CSRFToken, and a hit
+calls get_token() so new visitors get that cookie. Analytics are reported
+by beacons from the page, so they are logged on hits too.
+
+Entries and tag versions live in the PAGE_CACHE_ALIAS cache (local memory,
+or the filesystem when several processes must share it).
+"""
+import contextvars
+import hashlib
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+TAG_PREFIX = 'pagetag:'
+
+TRACKED_MODELS = [
+    'tools.Tool', 'tools.ToolStack', 'tools.Profession', 'tools.Category', 'tools.Tag',
+    'robots.Robot', 'robots.RobotCompany', 'robots.RobotNews',
+    'blogs.BlogPost',
+]
+
+# Rows shown as part of a tracked object: model -> foreign key to that object
+CHILD_MODELS = {
+    'tools.ToolTranslation': 'tool',
+    'tools.ToolMedia': 'tool',
+    'blogs.BlogChapter': 'blog_post',
+}
+
+_dependencies = contextvars.ContextVar('page_cache_dependencies', default=None)
+
+
+def get_page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def instance_tag(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def record_dependency(tag):
+    """Add a tag to the page being rendered, if any."""
+    tags = _dependencies.get()
+    if tags is not None:
+        tags.add(tag)
+
+
+def is_collecting():
+    """True while a page for the page cache is rendering."""
+    return _dependencies.get() is not None
+
+
+@contextmanager
+def collect_dependencies():
+    tags = set()
+    token = _dependencies.set(tags)
+    try:
+        yield tags
+    finally:
+        _dependencies.reset(token)
+
+
+def invalidate_tags(tags):
+    if tags:
+        now = time.time_ns()
+        get_page_cache().set_many({TAG_PREFIX + tag: now for tag in tags}, None)
+
+
+def invalidate_instance(model, pk):
+    invalidate_tags([instance_tag(model, pk), model_tag(model)])
+
+
+def is_cacheable_request(request):
+    return (
+        settings.PAGE_CACHE_ENABLED
+        and request.method in ('GET', 'HEAD')
+        and 'HX-Request' not in request.headers
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+        and not request.user.is_authenticated
+    )
+
+
+def _is_cacheable_response(request, response):
+    cookies = set(response.cookies) - {settings.CSRF_COOKIE_NAME}
+    cache_control = response.get('Cache-Control', '')
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not cookies
+        and not request.session.modified
+        and 'private' not in cache_control
+        and 'no-store' not in cache_control
+    )
+
+
+def _key(request):
+    return 'page:' + hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+
+
+def _get(request):
+    """Cached response for the request if none of its tags changed since it was stored."""
+    cache = get_page_cache()
+    entry = cache.get(_key(request))
+    if entry is None:
+        return None
+    current = cache.get_many(list(entry['tags']))
+    if any(current.get(key) != version for key, version in entry['tags'].items()):
+        return None
+
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    return response
+
+
+def _set(request, response, tags, started):
+    """Store the page unless one of its tags changed while it was rendering."""
+    cache = get_page_cache()
+    keys = [TAG_PREFIX + tag for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, started, None)
+            versions[key] = cache.get(key, started)
+    if any(version > started for version in versions.values()):
+        return
+
+    cache.set(_key(request), {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': list(response.items()),
+        'tags': versions,
+    }, settings.PAGE_CACHE_TIMEOUT)
+
+
+def cache_anonymous_page(*models):
+    """
+    Cache the view's pages for anonymous visitors. The page depends on the
+    tracked instances loaded while rendering and on every row of `models`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            response = _get(request)
+            if response is not None:
+                get_token(request)  # the page's scripts read the csrftoken cookie
+                return response
+
+            started = time.time_ns()
+            with collect_dependencies() as tags:
+                tags.update(model_tag(model) for model in models)
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render') and not response.is_rendered:
+                    response.render()  # TemplateResponse: load the objects inside the collector
+
+            if request.method == 'GET' and _is_cacheable_response(request, response):
+                try:
+                    _set(request, response, tags, started)
+                except Exception as e:
+                    print(f"Page Cache Error: {e}")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,82 @@
+"""
+Keyset (cursor) pagination for the tools browse infinite scroll.
+
+Every sort order ends with the primary key, so (sort values, id) of the last
+tool on a page identifies the position exactly. The next page is a range
+query after that position: no OFFSET scan and no COUNT. The position travels
+as a signed, opaque cursor string.
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .models import Tool
+
+# Browse sort name -> ordering (unique thanks to the trailing id)
+TOOL_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'oldest': ('created_at', 'id'),
+    'featured': ('-is_featured', '-created_at', '-id'),
+    'name_asc': ('name', 'id'),
+    'name_desc': ('-name', '-id'),
+    'popular': ('-popularity', '-created_at', '-id'),
+}
+DEFAULT_SORT = 'newest'
+
+CURSOR_SALT = 'tools.browse.cursor'
+
+
+def get_ordering(sort):
+    return TOOL_SORTS.get(sort, TOOL_SORTS[DEFAULT_SORT])
+
+
+def encode_cursor(obj, ordering):
+    """Opaque cursor for the position right after `obj`."""
+    values = []
+    for key in ordering:
+        value = getattr(obj, key.lstrip('-'))
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return signing.dumps(values, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor, ordering):
+    """Cursor -> field values, or None if it is invalid or from another sort order."""
+    try:
+        values = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    try:
+        return [Tool._meta.get_field(key.lstrip('-')).to_python(value) for key, value in zip(ordering, values)]
+    except ValidationError:
+        return None
+
+
+def after_position(values, ordering):
+    """Rows that come after `values` in `ordering`: (a > x) OR (a = x AND b > y) OR ..."""
+    condition = Q()
+    equal = Q()
+    for key, value in zip(ordering, values):
+        field = key.lstrip('-')
+        lookup = 'lt' if key.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{field}__{lookup}': value})
+        equal &= Q(**{field: value})
+    return condition
+
+
+def keyset_page(queryset, sort, cursor=None, per_page=20):
+    """
+    One page of `queryset` in browse `sort` order, starting after `cursor`.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    An invalid cursor starts from the beginning.
+    """
+    ordering = get_ordering(sort)
+    queryset = queryset.order_by(*ordering)
+    values = decode_cursor(cursor, ordering) if cursor else None
+    if values is not None:
+        queryset = queryset.filter(after_position(values, ordering))
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = encode_cursor(items[per_page - 1], ordering) if len(items) > per_page else None
+    return items[:per_page], next_cursor
@@ -0,0 +1,151 @@
+"""
+Denormalized popularity counters on Tool.
+
+Views, clicks and saves are counted in memory and added to the Tool columns
+(total_views, total_clicks, total_saves) with one F() update per tool when
+the event buffer flushes, so search ranking and "popular" sorting read plain
+columns instead of aggregating the event tables.
+
+The time-decayed `popularity` score is recomputed from the daily rollups by
+rollup_analytics, which can also recount the totals exactly (--recount).
+"""
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+# Event model -> Tool counter column
+EVENT_COUNTERS = {
+    'toolview': 'total_views',
+    'affiliateclick': 'total_clicks',
+}
+
+# Popularity score: weighted events, halved every HALF_LIFE_DAYS
+VIEW_WEIGHT = 1
+CLICK_WEIGHT = 3
+SAVE_WEIGHT = 5
+HALF_LIFE_DAYS = 14
+SCORE_DAYS = 90
+
+
+class ToolCounters:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(Counter)
+
+    def add(self, tool_id, field, delta=1):
+        with self._lock:
+            self._pending[tool_id][field] += delta
+
+    def observe_event(self, event):
+        """Count an analytics event instance (ToolView, AffiliateClick)."""
+        field = EVENT_COUNTERS.get(event._meta.model_name)
+        if field and event.tool_id:
+            self.add(event.tool_id, field)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Flush hook: apply pending deltas with one UPDATE per tool."""
+        from .models import Tool
+
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(Counter)
+
+        for tool_id, deltas in pending.items():
+            changes = {
+                # Unsaves can outnumber saves counted since the last recount
+                field: Greatest(F(field) + delta, 0)
+                for field, delta in deltas.items() if delta
+            }
+            if not changes:
+                continue
+            try:
+                Tool.objects.filter(pk=tool_id).update(**changes)
+            except Exception as e:
+                print(f"Popularity Counter Flush Error: {e}")
+
+
+_counters = None
+_counters_lock = threading.Lock()
+
+
+def get_tool_counters():
+    """Per-process counters, flushed with the analytics event buffer."""
+    global _counters
+    if _counters is None:
+        with _counters_lock:
+            if _counters is None:
+                counters = ToolCounters()
+                from .event_buffer import get_event_buffer
+                get_event_buffer().add_flush_hook(counters.flush)
+                _counters = counters
+    return _counters
+
+
+def refresh_popularity(today=None):
+    """
+    Recompute Tool.popularity from the last SCORE_DAYS days of rollups
+    (views, clicks) and saves. Returns the number of tools updated.
+    """
+    from .models import DailyMetric, SavedTool, Tool
+
+    today = today or timezone.localdate()
+    since = today - timedelta(days=SCORE_DAYS - 1)
+    weights = {'tool_view': VIEW_WEIGHT, 'tool_click': CLICK_WEIGHT}
+
+    def decay(day):
+        return 0.5 ** ((today - day).days / HALF_LIFE_DAYS)
+
+    scores = Counter()
+    rollups = DailyMetric.objects.filter(
+        metric__in=list(weights), day__gte=since
+    ).values_list('object_id', 'metric', 'day', 'count')
+    for tool_id, metric, day, count in rollups.iterator(chunk_size=2000):
+        scores[tool_id] += weights[metric] * count * decay(day)
+
+    saves = SavedTool.objects.filter(
+        created_at__date__gte=since
+    ).annotate(day=TruncDate('created_at')).values_list('tool_id', 'day').annotate(count=Count('id')).order_by()
+    for tool_id, day, count in saves:
+        scores[tool_id] += SAVE_WEIGHT * count * decay(day)
+
+    changed = []
+    for tool in Tool.objects.only('id', 'popularity').iterator(chunk_size=2000):
+        score = round(scores.get(tool.id, 0.0), 3)
+        if score != tool.popularity:
+            tool.popularity = score
+            changed.append(tool)
+    Tool.objects.bulk_update(changed, ['popularity'], batch_size=500)
+    return len(changed)
+
+
+def recount_totals():
+    """
+    Reset total_views / total_clicks / total_saves to exact values from the
+    rollups and SavedTool. Returns the number of tools updated.
+    """
+    from .models import DailyMetric, SavedTool, Tool
+
+    def totals(metric):
+        rows = DailyMetric.objects.filter(metric=metric).values('object_id').annotate(total=Sum('count'))
+        return {row['object_id']: row['total'] for row in rows}
+
+    views = totals('tool_view')
+    clicks = totals('tool_click')
+    saves = dict(SavedTool.objects.values_list('tool_id').annotate(count=Count('id')).order_by())
+
+    changed = []
+    for tool in Tool.objects.only('id', 'total_views', 'total_clicks', 'total_saves').iterator(chunk_size=2000):
+        counts = (views.get(tool.id, 0), clicks.get(tool.id, 0), saves.get(tool.id, 0))
+        if counts != (tool.total_views, tool.total_clicks, tool.total_saves):
+            tool.total_views, tool.total_clicks, tool.total_saves = counts
+            changed.append(tool)
+    Tool.objects.bulk_update(changed, ['total_views', 'total_clicks', 'total_saves'], batch_size=500)
+    return len(changed)
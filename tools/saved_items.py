@@ -0,0 +1,47 @@
+"""
+Per-request sets of the current user's saved tool, stack and robot ids.
+
+Each set is loaded with one query the first time a template (or view) asks
+for it and is then kept on the request, so "is this saved?" checks on list
+pages are set lookups instead of one exists() query per card.
+"""
+
+# Model name of the saved object -> (app label, Saved* model, id field)
+SAVED_MODELS = {
+    'tool': ('tools', 'SavedTool', 'tool_id'),
+    'toolstack': ('tools', 'SavedStack', 'stack_id'),
+    'robot': ('robots', 'SavedRobot', 'robot_id'),
+}
+
+
+def get_saved_ids(request, model_name):
+    """Set of ids of `model_name` objects ('tool', 'toolstack', 'robot') saved by request.user."""
+    from django.apps import apps
+
+    cache = request.__dict__.setdefault('_saved_ids', {})
+    if model_name not in cache:
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            cache[model_name] = set()
+        else:
+            app_label, saved_model, id_field = SAVED_MODELS[model_name]
+            model = apps.get_model(app_label, saved_model)
+            cache[model_name] = set(model.objects.filter(user=user).values_list(id_field, flat=True))
+    return cache[model_name]
+
+
+def is_saved(request, obj):
+    """True if the current user saved this Tool, ToolStack or Robot."""
+    if request is None or obj is None:
+        return False
+    return obj.pk in get_saved_ids(request, obj._meta.model_name)
+
+
+def mark_saved(request, obj, saved):
+    """Keep the request's set in line after a save/unsave toggle."""
+    cached = request.__dict__.get('_saved_ids', {}).get(obj._meta.model_name)
+    if cached is not None:
+        if saved:
+            cached.add(obj.pk)
+        else:
+            cached.discard(obj.pk)
@@ -1,6 +1,5 @@
 import chromadb
 from chromadb.utils import embedding_functions
-import os
 from django.conf import settings
 
 class SearchService:
@@ -10,8 +9,8 @@ class SearchService:
     @classmethod
     def get_client(cls):
         if cls._client is None:
-            # Persist data in the 'chroma_db' directory within the project
-            db_path = os.path.join(settings.BASE_DIR, 'chroma_db')
+            # Persist data in CHROMA_DB_PATH ('chroma_db' within the project)
+            db_path = str(settings.CHROMA_DB_PATH)
             try:
                 cls._client = chromadb.PersistentClient(path=db_path)
             except Exception as e:
@@ -84,7 +83,7 @@ class SearchService:
         
         for tool in tools:
             # We index English translation primarily
-            translation = tool.translations.filter(language='en').first()
+            translation = tool.get_translation('en')
             if not translation:
                 continue
                 
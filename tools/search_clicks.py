@@ -0,0 +1,71 @@
+"""
+Attribution of search result clicks to the search that showed the result.
+
+SearchQuery rows are written by the event buffer, so the results page does
+not know their ids. Result links send a "search_click" beacon carrying the
+query instead; the click is queued here and applied after the next buffer
+flush (once the search row exists): it fills clicked_tool on the latest
+search of that query by the same visitor (user, or session key) within
+SEARCH_CLICK_WINDOW seconds that has no click yet. Later clicks on the same
+results are not counted, so click-through is "searches with a click".
+
+cluster_searches leaves rows younger than the window alone, so their clicks
+are in place when the clusters count them.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class SearchClickQueue:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def add(self, query, tool_id, user_id, session_key):
+        with self._lock:
+            self._pending.append((query, tool_id, user_id, session_key, timezone.now()))
+
+    def flush_clicks(self):
+        """Set clicked_tool on the search each pending click came from."""
+        from .models import SearchQuery
+
+        with self._lock:
+            clicks, self._pending = self._pending, []
+
+        for query, tool_id, user_id, session_key, clicked_at in clicks:
+            searches = SearchQuery.objects.filter(
+                query__startswith=query,
+                clicked_tool__isnull=True,
+                created_at__gte=clicked_at - timedelta(seconds=settings.SEARCH_CLICK_WINDOW),
+                created_at__lte=clicked_at,
+            )
+            if user_id:
+                searches = searches.filter(user_id=user_id)
+            else:
+                searches = searches.filter(user__isnull=True, session_key=session_key)
+            try:
+                search_id = searches.order_by('-created_at').values_list('id', flat=True).first()
+                if search_id is not None:
+                    SearchQuery.objects.filter(id=search_id, clicked_tool__isnull=True).update(clicked_tool_id=tool_id)
+            except Exception as e:
+                print(f"Search Click Flush Error: {e}")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_search_click_queue():
+    """Per-process queue, applied by the event buffer's flush hook."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = SearchClickQueue()
+                from .event_buffer import get_event_buffer
+                get_event_buffer().add_flush_hook(_queue.flush_clicks)
+    return _queue
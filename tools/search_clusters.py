@@ -0,0 +1,208 @@
+"""
+Incremental clustering of search queries for the "content gaps" report.
+
+New SearchQuery rows (after the JobCheckpoint) are normalized and
+aggregated per query text. A query already known as a cluster variant goes
+straight to its cluster; a new one is embedded and joins the nearest cluster
+centroid when the cosine similarity reaches SEARCH_CLUSTER_MIN_SIMILARITY,
+otherwise it starts a cluster. Each cluster keeps running counts of
+searches, zero-result searches and searches with a click, so the report is
+a plain ordered query over SearchCluster. Rows are only read once they are
+older than SEARCH_CLICK_WINDOW, when no more clicks can be attributed to
+them (tools/search_clicks.py).
+
+Without the embedding model, queries are clustered by normalized text only.
+"""
+import re
+import unicodedata
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import JobCheckpoint, SearchCluster, SearchQuery
+from .search import SearchService
+
+CHECKPOINT_NAME = 'cluster_searches'
+
+# Variants stored per cluster (the most frequent); others still match by embedding
+MAX_VARIANTS = 50
+
+
+def normalize_query(query):
+    """Lowercase, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize('NFKC', query or '').lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())[:500]
+
+
+def embed(texts):
+    """Unit-length float32 embeddings, one row per text."""
+    vectors = np.asarray(SearchService.get_embedding_function()(texts), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+class SearchClusterer:
+
+    def __init__(self, min_similarity=None, use_embeddings=True):
+        self.min_similarity = min_similarity if min_similarity is not None else settings.SEARCH_CLUSTER_MIN_SIMILARITY
+        self.use_embeddings = use_embeddings
+        self.clusters = list(SearchCluster.objects.all())
+        self.by_variant = {variant: cluster for cluster in self.clusters for variant in cluster.variants}
+
+        # Centroid matrix (one row per cluster with a centroid) for nearest-cluster lookups
+        self._indexed = [cluster for cluster in self.clusters if cluster.centroid]
+        self._rows = {id(cluster): row for row, cluster in enumerate(self._indexed)}
+        self._matrix = np.array(
+            [np.frombuffer(bytes(cluster.centroid), dtype=np.float32) for cluster in self._indexed],
+            dtype=np.float32,
+        ) if self._indexed else None
+
+    @staticmethod
+    def aggregate(rows):
+        """(query, results_count, clicked_tool_id, created_at) rows -> per normalized query stats."""
+        stats = {}
+        for query, results_count, clicked_tool_id, created_at in rows:
+            normalized = normalize_query(query)
+            if not normalized:
+                continue
+            item = stats.setdefault(normalized, {
+                'count': 0, 'zero': 0, 'clicks': 0, 'first_seen': created_at, 'last_seen': created_at,
+            })
+            item['count'] += 1
+            item['zero'] += not results_count
+            item['clicks'] += clicked_tool_id is not None
+            item['first_seen'] = min(item['first_seen'], created_at)
+            item['last_seen'] = max(item['last_seen'], created_at)
+        return stats
+
+    def _nearest(self, vector):
+        if self._matrix is None:
+            return None
+        similarities = self._matrix @ vector
+        best = int(similarities.argmax())
+        return self._indexed[best] if similarities[best] >= self.min_similarity else None
+
+    def _add_to_index(self, cluster, vector):
+        cluster.centroid = vector.astype(np.float32).tobytes()
+        self._rows[id(cluster)] = len(self._indexed)
+        self._indexed.append(cluster)
+        row = vector[np.newaxis, :]
+        self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+
+    def _move_centroid(self, cluster, vector):
+        """Running mean of the cluster's variant embeddings, renormalized."""
+        index = self._rows[id(cluster)]
+        n = max(len(cluster.variants), 1)
+        centroid = self._matrix[index] * n + vector
+        centroid /= np.linalg.norm(centroid) or 1
+        self._matrix[index] = centroid
+        cluster.centroid = centroid.astype(np.float32).tobytes()
+
+    def assign(self, stats):
+        """Add aggregated stats to their clusters. Returns the changed clusters."""
+        new_queries = [query for query in stats if query not in self.by_variant]
+        vectors = None
+        if new_queries and self.use_embeddings:
+            try:
+                vectors = embed(new_queries)
+            except Exception as e:
+                print(f"Search Cluster Embedding Error: {e}. Falling back to exact query grouping.")
+                self.use_embeddings = False
+
+        for i, query in enumerate(new_queries):
+            item = stats[query]
+            cluster = self._nearest(vectors[i]) if vectors is not None else None
+            if cluster is None:
+                cluster = SearchCluster(
+                    label=query, variants={},
+                    first_seen=item['first_seen'], last_seen=item['last_seen'],
+                )
+                self.clusters.append(cluster)
+                if vectors is not None:
+                    self._add_to_index(cluster, vectors[i])
+            elif vectors is not None:
+                self._move_centroid(cluster, vectors[i])
+            cluster.variants[query] = 0
+            self.by_variant[query] = cluster
+
+        # Keyed by id(): unsaved model instances are not hashable
+        changed = {}
+        for query, item in stats.items():
+            cluster = self.by_variant[query]
+            cluster.variants[query] = cluster.variants.get(query, 0) + item['count']
+            cluster.search_count += item['count']
+            cluster.zero_result_count += item['zero']
+            cluster.click_count += item['clicks']
+            cluster.first_seen = min(cluster.first_seen, item['first_seen'])
+            cluster.last_seen = max(cluster.last_seen, item['last_seen'])
+            changed[id(cluster)] = cluster
+
+        for cluster in changed.values():
+            cluster.label = max(cluster.variants, key=cluster.variants.get)
+            if len(cluster.variants) > MAX_VARIANTS:
+                kept = sorted(cluster.variants.items(), key=lambda item: item[1], reverse=True)[:MAX_VARIANTS]
+                for variant in set(cluster.variants) - {variant for variant, _ in kept}:
+                    self.by_variant.pop(variant, None)
+                cluster.variants = dict(kept)
+        return list(changed.values())
+
+    @staticmethod
+    def save(changed, checkpoint, last_id):
+        """Write changed clusters and advance the checkpoint in one transaction."""
+        fields = ['label', 'variants', 'centroid', 'search_count', 'zero_result_count',
+                  'click_count', 'first_seen', 'last_seen']
+        new = [cluster for cluster in changed if cluster.pk is None]
+        existing = [cluster for cluster in changed if cluster.pk is not None]
+        with transaction.atomic():
+            SearchCluster.objects.bulk_create(new, batch_size=200)
+            SearchCluster.objects.bulk_update(existing, fields, batch_size=200)
+            checkpoint.last_id = last_id
+            checkpoint.save(update_fields=['last_id', 'updated_at'])
+
+
+def cluster_new_searches(batch_size=5000, use_embeddings=True, min_similarity=None):
+    """
+    Process SearchQuery rows added since the last run.
+    Returns (searches processed, clusters changed).
+    """
+    checkpoint, _ = JobCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    clusterer = SearchClusterer(min_similarity=min_similarity, use_embeddings=use_embeddings)
+
+    # Stop at the first row still open to clicks (ids follow created_at only roughly)
+    settled_before = timezone.now() - timedelta(seconds=settings.SEARCH_CLICK_WINDOW)
+    processed = changed_total = 0
+    while True:
+        batch = list(
+            SearchQuery.objects.filter(id__gt=checkpoint.last_id).order_by('id').values_list(
+                'id', 'query', 'results_count', 'clicked_tool_id', 'created_at'
+            )[:batch_size]
+        )
+        rows = []
+        for row in batch:
+            if row[4] >= settled_before:
+                break
+            rows.append(row)
+        if not rows:
+            break
+        stats = clusterer.aggregate(
+            row[1:] for row in rows if not row[1].startswith('[STACK_VIEW]')
+        )
+        changed = clusterer.assign(stats)
+        clusterer.save(changed, checkpoint, rows[-1][0])
+        processed += len(rows)
+        changed_total += len(changed)
+        if len(rows) < len(batch):
+            break
+    return processed, changed_total
+
+
+def reset_clusters():
+    """Drop all clusters and rewind the checkpoint (the next run starts over)."""
+    with transaction.atomic():
+        SearchCluster.objects.all().delete()
+        JobCheckpoint.objects.filter(name=CHECKPOINT_NAME).update(last_id=0)
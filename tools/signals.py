@@ -34,7 +34,7 @@ def send_welcome_email(request, email_address, **kwargs):
 
 # --- Search Indexing Signals ---
 from django.db.models.signals import post_save, post_delete
-from .models import Tool, ToolStack, Profession, ToolTranslation, Tag
+from .models import Tool, ToolStack, Profession, ToolTranslation, Tag, Category
 from .search import SearchService
 
 @receiver(post_save, sender=Tool)
@@ -78,3 +78,235 @@ def update_profession_index(sender, instance, **kwargs):
 def delete_profession_index(sender, instance, **kwargs):
     """Remove profession from index on delete."""
     SearchService.remove_professions([instance])
+
+# --- Card Fragment Cache Signals ---
+# Cached cards are keyed by updated_at; bump it when related data shown on the card changes.
+from django.db.models.signals import m2m_changed, pre_delete
+from .utils import touch_updated_at
+
+
+def touch_m2m_side(model, relation, instance, action, reverse, pk_set):
+    """Bump updated_at on the `model` side of an m2m change (forward or reverse)."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch_updated_at(model.objects.filter(pk=instance.pk))
+    elif pk_set:
+        touch_updated_at(model.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        touch_updated_at(model.objects.filter(**{relation: instance}))
+
+@receiver(m2m_changed, sender=Tool.tags.through)
+def touch_tool_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m_side(Tool, 'tags', instance, action, reverse, pk_set)
+
+@receiver(m2m_changed, sender=ToolStack.tools.through)
+def touch_stack_on_tools_change(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m_side(ToolStack, 'tools', instance, action, reverse, pk_set)
+
+@receiver(m2m_changed, sender=ToolStack.professions.through)
+def touch_stack_on_professions_change(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m_side(ToolStack, 'professions', instance, action, reverse, pk_set)
+
+@receiver(post_save, sender=ToolTranslation)
+@receiver(post_delete, sender=ToolTranslation)
+def touch_tool_on_translation_change(sender, instance, **kwargs):
+    """The tool card shows the short description."""
+    touch_updated_at(Tool.objects.filter(pk=instance.tool_id))
+
+@receiver(post_save, sender=Tag)
+def touch_tools_on_tag_change(sender, instance, **kwargs):
+    touch_updated_at(Tool.objects.filter(tags=instance))
+
+@receiver(post_save, sender=Tool)
+@receiver(pre_delete, sender=Tool)
+def touch_stacks_on_tool_change(sender, instance, **kwargs):
+    """Stack cards show their tools' names and logos."""
+    touch_updated_at(ToolStack.objects.filter(tools=instance))
+
+@receiver(post_save, sender=Profession)
+def touch_stacks_on_profession_change(sender, instance, **kwargs):
+    touch_updated_at(ToolStack.objects.filter(professions=instance))
+
+# --- Home Page Cache Signals ---
+# Sent when public catalog content changes; the home snapshot, hero pool and browse catalog rebuild (debounced).
+from django.dispatch import Signal
+from .hero import invalidate_hero_pool
+from .home import invalidate_home_snapshot
+from .catalog import invalidate_tool_catalog
+
+catalog_changed = Signal()
+
+@receiver(post_save, sender=Tool)
+@receiver(post_delete, sender=Tool)
+@receiver(post_save, sender=ToolTranslation)
+@receiver(post_save, sender=ToolStack)
+@receiver(post_delete, sender=ToolStack)
+@receiver(post_save, sender=Profession)
+@receiver(post_delete, sender=Profession)
+@receiver(m2m_changed, sender=Tool.tags.through)
+@receiver(m2m_changed, sender=ToolStack.tools.through)
+@receiver(m2m_changed, sender=ToolStack.professions.through)
+@receiver(m2m_changed, sender=Tool.categories.through)
+@receiver(m2m_changed, sender=Tool.professions.through)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def send_catalog_changed(sender, **kwargs):
+    catalog_changed.send(sender=sender)
+
+@receiver(catalog_changed)
+def invalidate_catalog_caches(sender, **kwargs):
+    invalidate_hero_pool()
+    invalidate_home_snapshot()
+    invalidate_tool_catalog()
+
+# --- Structured Data Signals ---
+# Detail pages emit the stored JSON-LD (SEOModel.schema_ld / breadcrumb_ld); regenerate it here.
+# Registered last, so updated_at bumps above are already in the database: every
+# touch of a Tool must refresh it too, or its stored dateModified goes stale.
+
+
+def refresh_structured_data(model, pks):
+    for obj in model.structured_data_queryset().filter(pk__in=pks):
+        obj.refresh_structured_data()
+
+
+def refresh_m2m_side(model, relation, instance, action, reverse, pk_set):
+    """Refresh the `model` side of an m2m change once the change is in the database."""
+    if action == 'pre_clear' and reverse:
+        # The rows losing the relation are unknown after the clear
+        instance._structured_data_pks = list(model.objects.filter(**{relation: instance}).values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            refresh_structured_data(model, [instance.pk])
+        elif action == 'post_clear':
+            refresh_structured_data(model, instance.__dict__.pop('_structured_data_pks', []))
+        elif pk_set:
+            refresh_structured_data(model, pk_set)
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Profession)
+def refresh_own_structured_data(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.refresh_structured_data()
+
+@receiver(post_save, sender=Category)
+def refresh_tools_on_category_change(sender, instance, raw=False, **kwargs):
+    """Tool schemas list their category names as keywords."""
+    if not raw:
+        refresh_structured_data(Tool, instance.tools.values_list('pk', flat=True))
+
+@receiver(pre_delete, sender=Category)
+def remember_category_tools(sender, instance, **kwargs):
+    instance._structured_data_pks = list(instance.tools.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Category)
+def refresh_tools_on_category_delete(sender, instance, **kwargs):
+    refresh_structured_data(Tool, instance.__dict__.pop('_structured_data_pks', []))
+
+@receiver(post_save, sender=Tool)
+def refresh_tool_structured_data(sender, instance, raw=False, **kwargs):
+    """The tool and the stacks whose HowTo steps show its name, logo and description."""
+    if not raw:
+        refresh_structured_data(Tool, [instance.pk])
+        refresh_structured_data(ToolStack, instance.stacks.values_list('pk', flat=True))
+
+@receiver(post_save, sender=ToolTranslation)
+@receiver(post_delete, sender=ToolTranslation)
+def refresh_tool_structured_data_from_translation(sender, instance, raw=False, **kwargs):
+    """Any translation bumps the tool's dateModified; stacks only show the English one."""
+    if raw:
+        return
+    refresh_structured_data(Tool, [instance.tool_id])
+    if instance.language == 'en':
+        refresh_structured_data(ToolStack, ToolStack.objects.filter(tools=instance.tool_id).values_list('pk', flat=True))
+
+@receiver(post_save, sender=Tag)
+def refresh_tools_on_tag_change(sender, instance, raw=False, **kwargs):
+    """The tagged tools' updated_at was bumped (dateModified)."""
+    if not raw:
+        refresh_structured_data(Tool, instance.tools.values_list('pk', flat=True))
+
+@receiver(m2m_changed, sender=Tool.tags.through)
+def refresh_tool_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    refresh_m2m_side(Tool, 'tags', instance, action, reverse, pk_set)
+
+@receiver(pre_delete, sender=Tool)
+def remember_tool_stacks(sender, instance, **kwargs):
+    instance._structured_data_pks = list(instance.stacks.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Tool)
+def refresh_stacks_on_tool_delete(sender, instance, **kwargs):
+    refresh_structured_data(ToolStack, instance.__dict__.pop('_structured_data_pks', []))
+
+@receiver(post_save, sender=ToolStack)
+def refresh_stack_structured_data(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_structured_data(ToolStack, [instance.pk])
+
+@receiver(m2m_changed, sender=Tool.categories.through)
+def refresh_tool_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    refresh_m2m_side(Tool, 'categories', instance, action, reverse, pk_set)
+
+@receiver(m2m_changed, sender=ToolStack.tools.through)
+def refresh_stack_on_tools_change(sender, instance, action, reverse, pk_set, **kwargs):
+    refresh_m2m_side(ToolStack, 'tools', instance, action, reverse, pk_set)
+
+# --- Notification Payload Signals ---
+from .models import Notification
+from .notifications import invalidate_notifications
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_notifications_on_change(sender, **kwargs):
+    invalidate_notifications()
+
+# --- Page Cache Signals ---
+# Record the tracked instances a cached page loads and expire their tags when they change (tools/page_cache.py).
+from django.apps import apps
+from django.db.models.signals import post_init
+from .page_cache import CHILD_MODELS, TRACKED_MODELS, instance_tag, invalidate_instance, invalidate_tags, model_tag, record_dependency
+
+
+def record_page_dependency(sender, instance, **kwargs):
+    if instance.pk is not None:
+        record_dependency(instance_tag(sender, instance.pk))
+
+
+def invalidate_page_tags(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_instance(sender, instance.pk)
+
+
+def invalidate_page_tags_m2m(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    tags = [instance_tag(type(instance), instance.pk), model_tag(type(instance)), model_tag(model)]
+    tags += [instance_tag(model, pk) for pk in pk_set or ()]
+    invalidate_tags(tags)
+
+
+def child_invalidator(field):
+    def invalidate_parent_page_tags(sender, instance, raw=False, **kwargs):
+        if not raw:
+            parent = sender._meta.get_field(field).related_model
+            invalidate_instance(parent, getattr(instance, f'{field}_id'))
+    return invalidate_parent_page_tags
+
+
+for label in TRACKED_MODELS:
+    tracked = apps.get_model(label)
+    post_init.connect(record_page_dependency, sender=tracked, dispatch_uid=f'page_cache_init_{label}')
+    post_save.connect(invalidate_page_tags, sender=tracked, dispatch_uid=f'page_cache_save_{label}')
+    post_delete.connect(invalidate_page_tags, sender=tracked, dispatch_uid=f'page_cache_delete_{label}')
+    for field in tracked._meta.many_to_many:
+        m2m_changed.connect(invalidate_page_tags_m2m, sender=field.remote_field.through,
+                            dispatch_uid=f'page_cache_m2m_{label}_{field.name}')
+
+for label, field in CHILD_MODELS.items():
+    child = apps.get_model(label)
+    invalidator = child_invalidator(field)
+    post_save.connect(invalidator, sender=child, dispatch_uid=f'page_cache_save_{label}', weak=False)
+    post_delete.connect(invalidator, sender=child, dispatch_uid=f'page_cache_delete_{label}', weak=False)
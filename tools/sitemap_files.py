@@ -0,0 +1,138 @@
+"""
+Sitemap files written to disk (generate_sitemaps command) for Apache to serve.
+
+Every section of config.sitemaps is split into pages of SITEMAP_MAX_URLS
+URLs, each written as SITEMAP_DIR/sitemap-<section>-<page>.xml.gz, and
+SITEMAP_DIR/sitemap.xml is the index pointing at them. A section is only
+rendered again when its signature changed: row count, latest updated_at and
+highest id of its queryset. Sections without updated_at (static pages,
+tags) are rendered every run, but their files are only rewritten when the
+content changed. Signatures and file names are kept in SITEMAP_STATE_PATH.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max, QuerySet
+from django.template.loader import render_to_string
+
+INDEX_NAME = 'sitemap.xml'
+
+
+def _write(path, data):
+    """Atomic write, so Apache never serves a half-written file."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def section_signature(sitemap):
+    """(count, latest updated_at, highest id) of the section, or None if it cannot tell."""
+    items = sitemap.items()
+    if not isinstance(items, QuerySet):
+        return None
+    try:
+        items.model._meta.get_field('updated_at')
+    except FieldDoesNotExist:
+        return None
+    data = items.order_by().aggregate(count=Count('pk'), latest=Max('updated_at'), last_id=Max('pk'))
+    return [data['count'], data['latest'].isoformat() if data['latest'] else None, data['last_id']]
+
+
+def render_section(name, sitemap, site, protocol):
+    """[(file name, gzipped xml, latest lastmod or None)] for every page of the section."""
+    files = []
+    for page in sitemap.paginator.page_range:
+        sitemap.latest_lastmod = None
+        urls = sitemap.get_urls(page=page, site=site, protocol=protocol)
+        xml = render_to_string('sitemap.xml', {'urlset': urls}).encode('utf-8')
+        # mtime=0: the same content always compresses to the same bytes
+        files.append((f'sitemap-{name}-{page}.xml.gz', gzip.compress(xml, mtime=0), sitemap.latest_lastmod))
+    return files
+
+
+def write_sitemaps(sitemaps, only=None, sitemap_dir=None, state_path=None, force=False, log=print):
+    """
+    Write the sections whose content may have changed (limited to the `only`
+    names if given; the others keep their files) and the index.
+    Returns the names of the sections that were rewritten.
+    """
+    sitemap_dir = Path(sitemap_dir or settings.SITEMAP_DIR)
+    state_path = Path(state_path or settings.SITEMAP_STATE_PATH)
+    sitemap_dir.mkdir(parents=True, exist_ok=True)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+
+    base_url = settings.SITE_HOST.rstrip('/')
+    protocol, domain = urlsplit(base_url)[:2]
+    # Stands in for the request's site (only .domain is read)
+    site = SimpleNamespace(domain=domain)
+
+    state = _load_state(state_path).get('sections', {})
+    sections = {}
+    changed = []
+    for name, sitemap in sitemaps.items():
+        previous = state.get(name, {})
+        if only is not None and name not in only and previous:
+            sections[name] = previous
+            continue
+        if force:
+            previous = {}
+
+        if callable(sitemap):
+            sitemap = sitemap()
+        sitemap.limit = settings.SITEMAP_MAX_URLS
+
+        signature = section_signature(sitemap)
+        if signature is not None and signature == previous.get('signature') and all(
+            (sitemap_dir / entry['name']).exists() for entry in previous.get('files', [])
+        ):
+            sections[name] = previous
+            continue
+
+        files = render_section(name, sitemap, site, protocol)
+        digest = hashlib.sha256(b''.join(data for _, data, _ in files)).hexdigest()
+        entries = [{'name': file_name, 'lastmod': lastmod.isoformat() if lastmod else None}
+                   for file_name, _, lastmod in files]
+        sections[name] = {'signature': signature, 'digest': digest, 'files': entries}
+        if digest == previous.get('digest') and entries == previous.get('files'):
+            continue
+
+        for file_name, data, _ in files:
+            _write(sitemap_dir / file_name, data)
+        changed.append(name)
+        log(f'{name}: {len(files)} file(s), {sitemap.paginator.count} URLs')
+
+    # Pages and sections that no longer exist
+    current = {entry['name'] for section in sections.values() for entry in section['files']}
+    for path in sitemap_dir.glob('sitemap-*.xml.gz'):
+        if path.name not in current:
+            path.unlink()
+
+    index = [
+        SitemapIndexItem(
+            f'{base_url}/sitemaps/{entry["name"]}',
+            datetime.fromisoformat(entry['lastmod']) if entry['lastmod'] else None,
+        )
+        for section in sections.values() for entry in section['files']
+    ]
+    _write(sitemap_dir / INDEX_NAME, render_to_string('sitemap_index.xml', {'sitemaps': index}).encode('utf-8'))
+
+    _write(state_path, json.dumps({'sections': sections}).encode('utf-8'))
+    return changed
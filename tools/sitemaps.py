@@ -62,7 +62,7 @@ class TagSitemap(Sitemap):
     priority = 0.6
 
     def items(self):
-        return Tag.objects.all()
+        return Tag.objects.order_by('name', 'id')
 
     def location(self, obj):
         return f"/tag/{obj.slug}/"
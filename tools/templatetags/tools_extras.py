@@ -1,9 +1,18 @@
 from django import template
-from tools.models import SavedTool, SavedStack
+from django.conf import settings
 from tools.utils import append_ref_param
+from tools.saved_items import is_saved
 
 register = template.Library()
 
+@register.simple_tag
+def card_cache_timeout():
+    """
+    CARD_CACHE_TIMEOUT for the card templates' {% cache %} blocks.
+    Usage: {% card_cache_timeout as card_timeout %}{% cache card_timeout ... %}
+    """
+    return settings.CARD_CACHE_TIMEOUT
+
 @register.filter
 def add_ref(url):
     """
@@ -12,19 +21,10 @@ def add_ref(url):
     return append_ref_param(url)
 
 @register.filter
-def is_saved_by(obj, user):
+def is_saved_in(obj, request):
     """
-    Check if a tool or stack is saved by the user.
-    Usage: {% if tool|is_saved_by:request.user %}
+    Check if a tool, stack or robot is saved by the request's user.
+    Loads the user's saved ids once per request (tools/saved_items.py).
+    Usage: {% if tool|is_saved_in:request %}
     """
-    if not user.is_authenticated:
-        return False
-        
-    # Check if obj is Tool (has pricing_type, etc) or ToolStack
-    # Duck typing or isinstance
-    if hasattr(obj, 'pricing_type'): # Tool
-        return SavedTool.objects.filter(user=user, tool=obj).exists()
-    elif hasattr(obj, 'tools'): # ToolStack (has m2m tools)
-        return SavedStack.objects.filter(user=user, stack=obj).exists()
-        
-    return False
+    return is_saved(request, obj)
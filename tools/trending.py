@@ -0,0 +1,144 @@
+"""
+In-memory "trending now" counters.
+
+Every logged view/click is added to a ring buffer of per-minute buckets
+covering the last day, with running totals for the last hour and day, so
+top-N queries never touch the database. Counters are per process (the site
+runs as a single mod_wsgi daemon process) and are snapshotted to
+TRENDING_SNAPSHOT_PATH so they survive restarts.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+WINDOWS = {'hour': 60, 'day': 1440}
+
+# Event model -> (entity type, id attribute, weight). Clicks signal more intent than views.
+EVENT_WEIGHTS = {
+    'toolview': ('tool', 'tool_id', 1),
+    'affiliateclick': ('tool', 'tool_id', 3),
+    'stackview': ('stack', 'stack_id', 1),
+    'robotview': ('robot', 'robot_id', 1),
+}
+
+
+class TrendingCounters:
+
+    def __init__(self):
+        self.size = WINDOWS['day']
+        self._lock = threading.Lock()
+        self._buckets = [Counter() for _ in range(self.size)]
+        self._totals = {window: Counter() for window in WINDOWS}
+        self._minute = self._now_minute()
+        self._last_snapshot = time.monotonic()
+
+    @staticmethod
+    def _now_minute():
+        return int(time.time() // 60)
+
+    def _advance(self, minute):
+        """Expire buckets that fell out of each window since the last event."""
+        if minute <= self._minute:
+            return
+        steps = min(minute - self._minute, self.size)
+        for step in range(1, steps + 1):
+            current = self._minute + step
+            for window, length in WINDOWS.items():
+                leaving = self._buckets[(current - length) % self.size]
+                if leaving:
+                    self._totals[window].subtract(leaving)
+            self._buckets[current % self.size] = Counter()
+        if minute - self._minute > self.size:
+            # Idle for more than a day: nothing is left
+            self._totals = {window: Counter() for window in WINDOWS}
+        for totals in self._totals.values():
+            for key in [key for key, value in totals.items() if value <= 0]:
+                del totals[key]
+        self._minute = minute
+
+    def add(self, entity, object_id, weight=1, minute=None):
+        """Count an event now, or at an earlier `minute` (snapshot replay)."""
+        key = (entity, object_id)
+        with self._lock:
+            self._advance(self._now_minute())
+            age = self._minute - (self._minute if minute is None else minute)
+            if not 0 <= age < self.size:
+                return
+            self._buckets[(self._minute - age) % self.size][key] += weight
+            for window, length in WINDOWS.items():
+                if age < length:
+                    self._totals[window][key] += weight
+
+    def observe_event(self, event):
+        """Count an analytics event instance (ToolView, AffiliateClick, ...)."""
+        mapping = EVENT_WEIGHTS.get(event._meta.model_name)
+        if mapping:
+            entity, id_attr, weight = mapping
+            self.add(entity, getattr(event, id_attr), weight)
+
+    def top(self, entity, window='hour', limit=10):
+        """Return [(object_id, score)] for the top objects of one entity type."""
+        with self._lock:
+            self._advance(self._now_minute())
+            items = [(key[1], score) for key, score in self._totals[window].items() if key[0] == entity]
+        return heapq.nlargest(limit, items, key=lambda item: item[1])
+
+    # --- Snapshots ---
+
+    def snapshot(self, path):
+        """Write non-empty buckets to `path` atomically."""
+        with self._lock:
+            data = {
+                'minute': self._minute,
+                'buckets': {
+                    str(self._minute - age): [[e, i, c] for (e, i), c in self._buckets[(self._minute - age) % self.size].items()]
+                    for age in range(self.size)
+                    if self._buckets[(self._minute - age) % self.size]
+                },
+            }
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        self._last_snapshot = time.monotonic()
+
+    def maybe_snapshot(self):
+        """Flush hook: snapshot at most every TRENDING_SNAPSHOT_INTERVAL seconds."""
+        if time.monotonic() - self._last_snapshot >= settings.TRENDING_SNAPSHOT_INTERVAL:
+            self.snapshot(settings.TRENDING_SNAPSHOT_PATH)
+
+    def load(self, path):
+        """Replay a snapshot; buckets older than a day are ignored."""
+        with open(path) as f:
+            data = json.load(f)
+        for minute, entries in data.get('buckets', {}).items():
+            for entity, object_id, count in entries:
+                self.add(entity, object_id, count, minute=int(minute))
+
+
+_trending = None
+_trending_lock = threading.Lock()
+
+
+def get_trending():
+    """Per-process counters, restored from the last snapshot on first use."""
+    global _trending
+    if _trending is None:
+        with _trending_lock:
+            if _trending is None:
+                counters = TrendingCounters()
+                path = settings.TRENDING_SNAPSHOT_PATH
+                if os.path.exists(path):
+                    try:
+                        counters.load(path)
+                    except (OSError, ValueError) as e:
+                        print(f"Trending Snapshot Load Error: {e}")
+                from .event_buffer import get_event_buffer
+                get_event_buffer().add_flush_hook(counters.maybe_snapshot)
+                _trending = counters
+    return _trending
@@ -13,6 +13,9 @@ urlpatterns = [
     path('tool/<slug:slug>/report/', views.report_tool, name='report_tool'),
     path('tool/<slug:slug>/', views.tool_detail, name='tool_detail'),
     path('visit/<slug:slug>/', views.visit_tool, name='visit_tool'),
+    path('api/events/', views.ingest_events, name='ingest_events'),
+    path('api/trending/', views.trending_api, name='trending_api'),
+    path('api/hero/', views.hero_api, name='hero_api'),
     path('stacks/', views.stacks, name='stacks'),
     path('stack/<slug:slug>/', views.stack_detail, name='stack_detail'),
     path('search/', views.search, name='search'),
@@ -28,6 +31,8 @@ urlpatterns = [
     
     # Admin Dashboard
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/export/<slug:table>/', views.admin_export, name='admin_export'),
+    path('admin-dashboard/content-gaps/', views.admin_content_gaps, name='admin_content_gaps'),
     
     # Tool Management
     path('admin-dashboard/tools/', views.admin_tools, name='admin_tools'),
@@ -1,3 +1,4 @@
+import threading
 from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
 
 def append_ref_param(url, ref="aijack.info"):
@@ -28,3 +29,46 @@ def append_ref_param(url, ref="aijack.info"):
     except Exception:
         # Fallback if parsing fails
         return url
+
+
+def touch_updated_at(queryset):
+    """
+    Bump updated_at on the given rows without running save() (no signals, no
+    reindexing). Used when related data shown on a cached card changes.
+    Stored JSON-LD embedding updated_at must be refreshed afterwards
+    (see the structured data signals in tools/signals.py).
+    """
+    from django.utils import timezone
+    return queryset.update(updated_at=timezone.now())
+
+
+class DebouncedTask:
+    """
+    Runs `func` in a background thread `delay` seconds after schedule() is
+    first called; further calls before it runs are merged into that run.
+    """
+
+    def __init__(self, func, delay):
+        self.func = func
+        self.delay = delay
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        from django.db import close_old_connections
+        with self._lock:
+            self._timer = None
+        try:
+            self.func()
+        except Exception as e:
+            print(f"Background Task Error ({self.func.__name__}): {e}")
+        finally:
+            close_old_connections()
+
+    def schedule(self):
+        with self._lock:
+            if self._timer is None:
+                delay = self.delay() if callable(self.delay) else self.delay
+                self._timer = threading.Timer(delay, self._run)
+                self._timer.daemon = True
+                self._timer.start()
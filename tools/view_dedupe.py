@@ -0,0 +1,124 @@
+"""
+Short-window deduplication of page views.
+
+A view of the same object by the same visitor (session key, or hashed IP)
+within ANALYTICS_DEDUPE_WINDOW seconds is a repeat: it is not written as a
+row, only counted. Repeats are added to the "<metric>_repeat" DailyMetric
+rows whenever the event buffer flushes.
+
+Seen keys live in two rotating Bloom filters (current and previous window),
+so memory is fixed regardless of traffic. A key is remembered for between one
+and two windows. A Bloom false positive (about 0.1% at capacity) makes a first
+view count as a repeat.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class ViewDeduper:
+
+    def __init__(self, window=1800, capacity=100000):
+        self.window = window
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._current = BloomFilter(capacity)
+        self._previous = BloomFilter(capacity)
+        self._rotated_at = time.monotonic()
+        self._repeats = Counter()
+        self.stats = {'checked': 0, 'suppressed': 0, 'rotations': 0}
+
+    def is_repeat(self, metric, object_id, visitor):
+        """
+        Return True if this visitor already viewed the object in the window,
+        and count it as a repeat. Otherwise remember the view and return False.
+        """
+        key = f'{metric}:{object_id}:{visitor}'
+        with self._lock:
+            self._rotate()
+            self.stats['checked'] += 1
+            if key in self._current or key in self._previous:
+                self.stats['suppressed'] += 1
+                self._repeats[(metric, object_id, timezone.localdate())] += 1
+                return True
+            self._current.add(key)
+            return False
+
+    def _rotate(self):
+        if time.monotonic() - self._rotated_at >= self.window:
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity)
+            self._rotated_at = time.monotonic()
+            self.stats['rotations'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, pending_repeats=sum(self._repeats.values()))
+
+    def flush_repeats(self):
+        """Add pending repeat counts to DailyMetric '<metric>_repeat' rows."""
+        from .models import DailyMetric
+
+        with self._lock:
+            repeats, self._repeats = self._repeats, Counter()
+
+        for (metric, object_id, day), count in repeats.items():
+            lookup = {'day': day, 'metric': f'{metric}_repeat', 'object_id': object_id}
+            try:
+                if not DailyMetric.objects.filter(**lookup).update(count=F('count') + count):
+                    try:
+                        with transaction.atomic():
+                            DailyMetric.objects.create(count=count, **lookup)
+                    except IntegrityError:
+                        DailyMetric.objects.filter(**lookup).update(count=F('count') + count)
+            except Exception as e:
+                print(f"View Dedupe Flush Error: {e}")
+
+
+_deduper = None
+_deduper_lock = threading.Lock()
+
+
+def get_view_deduper():
+    """Per-process deduper, or None when ANALYTICS_DEDUPE_ENABLED is off."""
+    global _deduper
+    if not settings.ANALYTICS_DEDUPE_ENABLED:
+        return None
+    if _deduper is None:
+        with _deduper_lock:
+            if _deduper is None:
+                _deduper = ViewDeduper(
+                    window=settings.ANALYTICS_DEDUPE_WINDOW,
+                    capacity=settings.ANALYTICS_DEDUPE_CAPACITY,
+                )
+                from .event_buffer import get_event_buffer
+                get_event_buffer().add_flush_hook(_deduper.flush_repeats)
+    return _deduper
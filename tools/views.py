@@ -1,13 +1,15 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Q, Case, When, Count
+from django.db.models import Q, Case, When, Count, Exists, OuterRef
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_POST
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.mail import send_mail
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.conf import settings
 import json
 from .models import Tool, Profession, Category, ToolStack, Tag, SavedTool, SavedStack, SubmittedTool, ToolReport
@@ -15,130 +17,25 @@ from .forms import ToolForm, ToolStackForm, ProfessionForm, ToolSubmissionForm
 from .search import SearchService
 from .ai_service import AIService
 from .analytics import AnalyticsService
+from .saved_items import mark_saved
+from .hero import get_hero_data
+from .home import get_home_snapshot
+from .notifications import get_notifications_payload
+from .pagination import keyset_page
+from .catalog import FACETS, get_tool_catalog
+from .listing import aggregate_counts, get_listing, is_next_page_request, render_listing
+from .page_cache import cache_anonymous_page
 from blogs.models import BlogPost
 
 
 def home(request):
     """Homepage with search and featured content."""
-    from datetime import date, timedelta
-    
-    today = date.today()
-    thirty_days_ago = today - timedelta(days=30)
-    
-    professions = Profession.objects.all()[:16]
-    featured_stacks = ToolStack.objects.filter(is_featured=True, visibility='public')[:4]
-    featured_tools = Tool.objects.filter(status='published', is_featured=True)[:6]
-
-    # Global counts
-    tool_count = Tool.objects.filter(status='published').count()
-    stack_count = ToolStack.objects.filter(visibility='public').count()
-    profession_count = Profession.objects.count()
-    
-    # Highlighted items (within highlight date range)
-    highlighted_stacks = ToolStack.objects.filter(
-        visibility='public',
-        highlight_start__lte=today,
-        highlight_end__gte=today
-    ).order_by('-highlight_start')[:4]
-    
-    highlighted_tools = Tool.objects.filter(
-        status='published',
-        highlight_start__lte=today,
-        highlight_end__gte=today
-    ).prefetch_related('translations', 'tags').order_by('-highlight_start')[:6]
-    
-    # Newbies (created in last 30 days)
-    stack_newbies = ToolStack.objects.filter(
-        visibility='public',
-        created_at__gte=thirty_days_ago
-    ).order_by('-created_at')[:4]
-    
-    app_newbies = Tool.objects.filter(
-        status='published',
-        created_at__gte=thirty_days_ago
-    ).prefetch_related('translations', 'tags').order_by('-created_at')[:6]
-    
-    # Hero Animation Data
-    import random
-    from django.template.loader import render_to_string
-    from robots.models import Robot
-
-    hero_data = {
-        'tools': [],
-        'professions': [],
-        'stacks': [],
-        'robots': []
-    }
-
-    # Helper to serialize
-    def serialize_hero_item(item, type_name):
-        data = {
-            'type': type_name,
-            'name': item.name,
-            'html': '',
-            'description': ''
-        }
-        
-        if type_name == 'tool':
-            # Get short description from translation or meta
-            trans = item.get_translation('en')
-            data['description'] = trans.short_description if trans else item.meta_description or "AI Tool"
-            data['html'] = render_to_string('includes/_tool_card.html', {'tool': item, 'request': request})
-            
-        elif type_name == 'profession':
-            data['description'] = item.hero_tagline or f"AI tools for {item.name}"
-            data['html'] = render_to_string('includes/_profession_card.html', {'profession': item})
-            
-        elif type_name == 'stack':
-            data['description'] = item.tagline
-            data['html'] = render_to_string('includes/_stack_card.html', {'stack': item, 'request': request})
-
-        elif type_name == 'robot':
-            data['description'] = item.short_description
-            data['html'] = render_to_string('robots/includes/_robot_card.html', {'robot': item, 'request': request})
-
-        return data
-
-    # 1. Random Tools (Verified/Published with Logo)
-    tools_pool = list(Tool.objects.filter(status='published', logo__isnull=False).exclude(logo='').values_list('id', flat=True))
-    if tools_pool:
-        random_tool_ids = random.sample(tools_pool, min(len(tools_pool), 5))
-        for t in Tool.objects.filter(id__in=random_tool_ids):
-            hero_data['tools'].append(serialize_hero_item(t, 'tool'))
-
-    # 2. Random Professions (with Icon)
-    prof_pool = list(Profession.objects.exclude(icon='').values_list('id', flat=True))
-    if prof_pool:
-        random_prof_ids = random.sample(prof_pool, min(len(prof_pool), 5))
-        for p in Profession.objects.filter(id__in=random_prof_ids):
-            hero_data['professions'].append(serialize_hero_item(p, 'profession'))
-
-    # 3. Random Stacks (Public)
-    stack_pool = list(ToolStack.objects.filter(visibility='public').values_list('id', flat=True))
-    if stack_pool:
-        random_stack_ids = random.sample(stack_pool, min(len(stack_pool), 5))
-        for s in ToolStack.objects.filter(id__in=random_stack_ids):
-             hero_data['stacks'].append(serialize_hero_item(s, 'stack'))
-
-    # 4. Random Robots (Published with Image)
-    robot_pool = list(Robot.objects.filter(status='published', image__isnull=False).exclude(image='').values_list('id', flat=True))
-    if robot_pool:
-        random_robot_ids = random.sample(robot_pool, min(len(robot_pool), 5))
-        for r in Robot.objects.filter(id__in=random_robot_ids):
-             hero_data['robots'].append(serialize_hero_item(r, 'robot'))
+    snapshot = get_home_snapshot()
+    hero_pool = snapshot.pop('hero_pool', None)
 
     return render(request, 'home.html', {
-        'professions': professions,
-        'featured_stacks': featured_stacks,
-        'featured_tools': featured_tools,
-        'highlighted_stacks': highlighted_stacks,
-        'highlighted_tools': highlighted_tools,
-        'stack_newbies': stack_newbies,
-        'app_newbies': app_newbies,
-        'tool_count': tool_count,
-        'stack_count': stack_count,
-        'profession_count': profession_count,
-        'hero_data': hero_data,
+        **snapshot,
+        'hero_data': get_hero_data(hero_pool) if hero_pool else None,
     })
 
 
@@ -173,186 +70,157 @@ def guide(request):
     })
 
 
+@cache_anonymous_page(Profession)
 def professions(request):
     """List all professions."""
-    professions = Profession.objects.all()
-    return render(request, 'professions.html', {
-        'professions': professions,
-    })
+    professions = Profession.objects.order_by('name', 'id')
+    listing = get_listing(request, 'professions', professions, 'includes/listing/_profession.html',
+                          counts=lambda: aggregate_counts(professions))
+    return render_listing(request, 'professions.html', {}, listing)
+
+
+def _browse_filters(request):
+    """Selected facet values ({facet: [slug, ...]}); several values per facet are allowed."""
+    return {
+        facet: list(dict.fromkeys(value for value in request.GET.getlist(facet) if value))
+        for facet in FACETS
+    }
+
+
+def _browse_query(request):
+    """Filter and sort parameters to carry over to the next infinite scroll page."""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    params.pop('page', None)
+    return params.urlencode()
+
+
+def _filter_browse_tools(tools, filters):
+    """
+    Apply the browse filters: any of the values within a facet, all facets together.
+    M2M facets are correlated EXISTS subqueries on the through tables (indexed by
+    tool_id), so the result needs no DISTINCT.
+    """
+    m2m_facets = (
+        ('category', Tool.categories.through, 'category', Category),
+        ('profession', Tool.professions.through, 'profession', Profession),
+        ('tag', Tool.tags.through, 'tag', Tag),
+    )
+    for facet, through, field, model in m2m_facets:
+        if filters[facet]:
+            tools = tools.filter(Exists(through.objects.filter(
+                tool_id=OuterRef('pk'),
+                **{f'{field}_id__in': model.objects.filter(slug__in=filters[facet]).values('id')},
+            )))
+    if filters['pricing']:
+        tools = tools.filter(pricing_type__in=filters['pricing'])
+    return tools
 
 
 def browse_tools(request):
     """Public tools browse page with filters and infinite scroll."""
-    tools = Tool.objects.filter(status='published').prefetch_related('translations', 'tags', 'categories', 'professions')
-    
-    # Get filter options for dropdowns
-    categories = Category.objects.all().order_by('name')
-    all_professions = Profession.objects.all().order_by('name')
-    tags = Tag.objects.all().order_by('name')
-    
-    # Apply filters
-    category_slug = request.GET.get('category', '')
-    profession_slug = request.GET.get('profession', '')
-    pricing = request.GET.get('pricing', '')
-    tag_slug = request.GET.get('tag', '')
-    
-    if category_slug:
-        tools = tools.filter(categories__slug=category_slug)
-    if profession_slug:
-        tools = tools.filter(professions__slug=profession_slug)
-    if pricing:
-        tools = tools.filter(pricing_type=pricing)
-    if tag_slug:
-        tools = tools.filter(tags__slug=tag_slug)
-    
-    # Apply sorting
+    filters = _browse_filters(request)
     sort = request.GET.get('sort', 'newest')
-    if sort == 'newest':
-        tools = tools.order_by('-created_at')
-    elif sort == 'oldest':
-        tools = tools.order_by('created_at')
-    elif sort == 'featured':
-        tools = tools.order_by('-is_featured', '-created_at')
-    elif sort == 'name_asc':
-        tools = tools.order_by('name')
-    elif sort == 'name_desc':
-        tools = tools.order_by('-name')
-    else:
-        tools = tools.order_by('-created_at')
-    
-    # Remove duplicates that might occur from multiple M2M joins
-    tools = tools.distinct()
-    
-    # Pagination
-    page = int(request.GET.get('page', 1))
-    per_page = 20
-    paginator = Paginator(tools, per_page)
-    tools_page = paginator.get_page(page)
-    
-    total_count = paginator.count
-    has_more = tools_page.has_next()
-    next_page = tools_page.next_page_number() if has_more else None
-    
-    # Build active filters for display
     active_filters = []
-    if category_slug:
-        cat = Category.objects.filter(slug=category_slug).first()
-        if cat:
-            active_filters.append({'type': 'category', 'slug': category_slug, 'name': cat.name})
-    if profession_slug:
-        prof = Profession.objects.filter(slug=profession_slug).first()
-        if prof:
-            active_filters.append({'type': 'profession', 'slug': profession_slug, 'name': prof.name})
-    if pricing:
-        pricing_display = dict(Tool.PRICING_CHOICES).get(pricing, pricing)
-        active_filters.append({'type': 'pricing', 'slug': pricing, 'name': pricing_display})
-    if tag_slug:
-        tag_obj = Tag.objects.filter(slug=tag_slug).first()
-        if tag_obj:
-            active_filters.append({'type': 'tag', 'slug': tag_slug, 'name': tag_obj.name})
+    pricing_counts = None
+    
+    catalog = get_tool_catalog() if settings.TOOL_CATALOG_IN_MEMORY else None
+    if catalog:
+        # In-memory catalog: page, total and per-option counts without database queries
+        tools_page, next_cursor, total_count = catalog.query(filters, sort, per_page=20)
+        options = catalog.facet_options(filters)
+        categories, all_professions, tags = options['category'], options['profession'], options['tag']
+        pricing_counts = {option.slug: option.facet_count for option in options['pricing']}
+        for facet in FACETS:
+            for slug in filters[facet]:
+                name = catalog.option_name(facet, slug)
+                if name:
+                    active_filters.append({'type': facet, 'slug': slug, 'name': name})
+    else:
+        tools = Tool.objects.filter(status='published').prefetch_related(Tool.prefetch_translations(), 'tags', 'categories', 'professions')
+        tools = _filter_browse_tools(tools, filters)
+        
+        # Get filter options for dropdowns
+        categories = Category.objects.all().order_by('name')
+        all_professions = Profession.objects.all().order_by('name')
+        tags = Tag.objects.all().order_by('name')
+        
+        # First page; further pages come from browse_tools_api by cursor
+        tools_page, next_cursor = keyset_page(tools, sort, per_page=20)
+        total_count = tools.count()
+        
+        # Build active filters for display
+        names = {
+            'category': dict(Category.objects.filter(slug__in=filters['category']).values_list('slug', 'name')),
+            'profession': dict(Profession.objects.filter(slug__in=filters['profession']).values_list('slug', 'name')),
+            'pricing': dict(Tool.PRICING_CHOICES),
+            'tag': dict(Tag.objects.filter(slug__in=filters['tag']).values_list('slug', 'name')),
+        }
+        for facet in FACETS:
+            for slug in filters[facet]:
+                if slug in names[facet]:
+                    active_filters.append({'type': facet, 'slug': slug, 'name': names[facet][slug]})
     
     context = {
         'tools': tools_page,
         'categories': categories,
         'professions': all_professions,
         'tags': tags,
+        'pricing_counts': pricing_counts,
         'total_count': total_count,
-        'has_more': has_more,
-        'next_page': next_page,
-        'current_page': page,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
         'active_filters': active_filters,
+        'filter_query': _browse_query(request),
         'current_sort': sort,
-        'filter_category': category_slug,
-        'filter_profession': profession_slug,
-        'filter_pricing': pricing,
-        'filter_tag': tag_slug,
+        'filter_category': filters['category'],
+        'filter_profession': filters['profession'],
+        'filter_pricing': filters['pricing'],
+        'filter_tag': filters['tag'],
     }
     
     return render(request, 'browse_tools.html', context)
 
 
 def browse_tools_api(request):
-    """API endpoint for infinite scroll - returns JSON or HTML partial."""
-    tools = Tool.objects.filter(status='published').prefetch_related('translations', 'tags', 'categories', 'professions')
-    
-    # Apply filters
-    category_slug = request.GET.get('category', '')
-    profession_slug = request.GET.get('profession', '')
-    pricing = request.GET.get('pricing', '')
-    tag_slug = request.GET.get('tag', '')
-    
-    if category_slug:
-        tools = tools.filter(categories__slug=category_slug)
-    if profession_slug:
-        tools = tools.filter(professions__slug=profession_slug)
-    if pricing:
-        tools = tools.filter(pricing_type=pricing)
-    if tag_slug:
-        tools = tools.filter(tags__slug=tag_slug)
-    
-    # Apply sorting
+    """
+    API endpoint for infinite scroll - returns the HTML partial.
+    ?cursor=<opaque cursor from the previous page> plus the browse filters (repeatable) and sort.
+    """
+    filters = _browse_filters(request)
     sort = request.GET.get('sort', 'newest')
-    if sort == 'newest':
-        tools = tools.order_by('-created_at')
-    elif sort == 'oldest':
-        tools = tools.order_by('created_at')
-    elif sort == 'featured':
-        tools = tools.order_by('-is_featured', '-created_at')
-    elif sort == 'name_asc':
-        tools = tools.order_by('name')
-    elif sort == 'name_desc':
-        tools = tools.order_by('-name')
-    else:
-        tools = tools.order_by('-created_at')
+    cursor = request.GET.get('cursor')
     
-    tools = tools.distinct()
-    
-    # Pagination
-    try:
-        page = int(request.GET.get('page', 1))
-    except (ValueError, TypeError):
-        page = 1
-        
-    per_page = 20
-    paginator = Paginator(tools, per_page)
-    tools_page = paginator.get_page(page)
-    
-    has_more = tools_page.has_next()
-    next_page = tools_page.next_page_number() if has_more else None
+    catalog = get_tool_catalog() if settings.TOOL_CATALOG_IN_MEMORY else None
+    if catalog:
+        tools_page, next_cursor, _ = catalog.query(filters, sort, cursor=cursor, per_page=20)
+    else:
+        tools = Tool.objects.filter(status='published').prefetch_related(Tool.prefetch_translations(), 'tags', 'categories', 'professions')
+        tools = _filter_browse_tools(tools, filters)
+        # Keyset pagination: one range query per page, no COUNT/OFFSET
+        tools_page, next_cursor = keyset_page(tools, sort, cursor=cursor, per_page=20)
     
     # Return HTML partial for HTMX/infinite scroll
     return render(request, 'partials/_tools_grid_items.html', {
         'tools': tools_page,
-        'has_more': has_more,
-        'next_page': next_page,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
+        'filter_query': _browse_query(request),
     })
 
 
 
+@cache_anonymous_page(Tool)
 def profession_detail(request, slug, pricing=None):
     """Profession landing page with filtered tools."""
     profession = get_object_or_404(Profession, slug=slug)
-    tools = Tool.objects.filter(
-        status='published',
-        professions=profession
-    ).prefetch_related('translations', 'tags')
     
     # Base query for counts (unfiltered by pricing)
     base_tools = Tool.objects.filter(
         status='published',
         professions=profession
     )
-    
-    # Log view
-    AnalyticsService.log_profession_view(request, profession, source_page='profession_detail')
-    
-    # Calculate counts
-    counts = {
-        'all': base_tools.count(),
-        'free': base_tools.filter(pricing_type='free').count(),
-        'freemium': base_tools.filter(pricing_type='freemium').count(),
-        'paid': base_tools.filter(pricing_type='paid').count(),
-    }
+    tools = base_tools.prefetch_related(Tool.prefetch_translations(), 'tags').order_by('-is_featured', '-created_at', '-id')
 
     # Apply pricing filter if selected
     # Check both path param (pricing) and query param (request.GET) for backward compatibility if needed
@@ -360,42 +228,48 @@ def profession_detail(request, slug, pricing=None):
     
     if pricing_filter:
         tools = tools.filter(pricing_type=pricing_filter)
+
+    # Pricing tab counts in one query
+    listing = get_listing(
+        request, 'profession', tools, 'includes/listing/_tool.html',
+        counts=lambda: aggregate_counts(base_tools, 'pricing_type', [value for value, _ in Tool.PRICING_CHOICES]),
+    )
+    if is_next_page_request(request):
+        return render_listing(request, 'profession_detail.html', {}, listing)
+
     stacks = ToolStack.objects.filter(professions=profession)[:3]
 
     # Related Blog Posts
     related_blog_posts = profession.blog_posts.filter(is_published=True).distinct()
     
-    return render(request, 'profession_detail.html', {
+    return render_listing(request, 'profession_detail.html', {
         'profession': profession,
-        'tools': tools,
         'stacks': stacks,
-        'counts': counts,
+        'counts': listing['counts'],
         'related_blog_posts': related_blog_posts,
-    })
+    }, listing)
 
 
+@cache_anonymous_page()
 def tool_detail(request, slug):
     """Single tool detail page."""
+    lang = request.GET.get('lang', 'en')
     tool = get_object_or_404(
-        Tool.objects.prefetch_related('translations', 'tags', 'categories', 'professions'),
+        Tool.objects.prefetch_related(Tool.prefetch_translations(lang), 'tags', 'categories', 'professions'),
         slug=slug, 
         status='published'
     )
     
     # Get translation (default to English)
-    lang = request.GET.get('lang', 'en')
     translation = tool.get_translation(lang)
     
     # Related tools (same profession or category)
     related_tools = Tool.objects.filter(
         status='published',
         professions__in=tool.professions.all()
-    ).exclude(id=tool.id).distinct()[:4]
+    ).exclude(id=tool.id).distinct().prefetch_related(Tool.prefetch_translations())[:4]
     
     
-    # Log tool view for analytics
-    AnalyticsService.log_tool_view(request, tool, source_page='tool_detail')
-    
     # Related Blog Posts
     related_blog_posts = tool.blog_posts.filter(is_published=True).distinct()
 
@@ -407,15 +281,92 @@ def tool_detail(request, slug):
     })
 
 
+@csrf_exempt
+@require_POST
+def ingest_events(request):
+    """
+    Beacon endpoint for view and click events (navigator.sendBeacon).
+    Body: {"events": [{"type": "tool_view", "id": 12, "source": "tool_detail", "pv": "<page view id>"}]}
+    Always answers 204; invalid events are ignored.
+    """
+    if not AnalyticsService.is_same_origin(request):
+        return HttpResponse(status=403)
+    if len(request.body) > AnalyticsService.BEACON_MAX_BYTES:
+        return HttpResponse(status=413)
+
+    try:
+        payload = json.loads(request.body)
+        events = payload.get('events', []) if isinstance(payload, dict) else []
+    except (ValueError, UnicodeDecodeError):
+        return HttpResponse(status=400)
+
+    if not AnalyticsService.is_bot(request):
+        AnalyticsService.log_beacon_events(request, events)
+    return HttpResponse(status=204)
+
+
+def hero_api(request):
+    """Hero animation cards for the home page (random picks from the cached pool)."""
+    response = JsonResponse(get_hero_data())
+    patch_cache_control(response, public=True, max_age=settings.HERO_API_MAX_AGE)
+    return response
+
+
+def trending_api(request):
+    """
+    Trending tools, stacks and robots from the in-memory counters.
+    ?window=hour|day  ?type=tool|stack|robot (default: all)  ?limit=10 (max 50)
+    """
+    from django.urls import reverse
+    from robots.models import Robot
+
+    window = request.GET.get('window', 'hour')
+    if window not in ('hour', 'day'):
+        window = 'hour'
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except (ValueError, TypeError):
+        limit = 10
+
+    sources = {
+        'tool': (Tool.objects.filter(status='published'), 'tool_detail'),
+        'stack': (ToolStack.objects.filter(visibility='public'), 'stack_detail'),
+        'robot': (Robot.objects.filter(status='published'), 'robot_detail'),
+    }
+    requested = request.GET.get('type')
+    types = [requested] if requested in sources else list(sources)
+
+    results = {}
+    for entity in types:
+        queryset, url_name = sources[entity]
+        # Ask for a few extra ids: some may be unpublished or deleted
+        ranked = AnalyticsService.get_trending(entity, window, limit * 2)
+        objects = queryset.only('id', 'name', 'slug').in_bulk([object_id for object_id, _ in ranked])
+        results[entity + 's'] = [
+            {
+                'id': object_id,
+                'name': objects[object_id].name,
+                'slug': objects[object_id].slug,
+                'url': reverse(url_name, args=[objects[object_id].slug]),
+                'score': score,
+            }
+            for object_id, score in ranked if object_id in objects
+        ][:limit]
+
+    return JsonResponse({'window': window, **results})
+
+
 def visit_tool(request, slug):
     """
     Handle logic when user clicks 'Visit Website'.
     Logs an AffiliateClick and redirects to external URL.
+    Links clicked with JS are already logged by beacon and carry ?tracked=1.
     """
     tool = get_object_or_404(Tool, slug=slug, status='published')
     
-    # Log the click (AffiliateClick)
-    AnalyticsService.log_affiliate_click(request, tool, source_page='tool_detail')
+    # Log the click (AffiliateClick) unless the beacon already did
+    if request.GET.get('tracked') != '1':
+        AnalyticsService.log_affiliate_click(request, tool, source_page='tool_detail')
     
     # Redirect to affiliate URL if exists, else website URL
     target_url = tool.affiliate_url if tool.affiliate_url else tool.website_url
@@ -499,14 +450,16 @@ def report_tool(request, slug):
 
 
 
+@cache_anonymous_page(ToolStack)
 def stacks(request):
     """List all tool stacks."""
-    stacks = ToolStack.objects.prefetch_related('tools', 'professions').all()
-    return render(request, 'stacks.html', {
-        'stacks': stacks,
-    })
+    stacks = ToolStack.objects.prefetch_related('tools', 'professions').order_by('-is_featured', '-created_at', '-id')
+    listing = get_listing(request, 'stacks', stacks, 'includes/listing/_stack.html',
+                          counts=lambda: aggregate_counts(stacks))
+    return render_listing(request, 'stacks.html', {}, listing)
 
 
+@cache_anonymous_page()
 def stack_detail(request, slug):
     """Tool stack detail page."""
     stack = get_object_or_404(
@@ -514,9 +467,6 @@ def stack_detail(request, slug):
         slug=slug
     )
     
-    # Log stack view for analytics
-    AnalyticsService.log_stack_view(request, stack, source_page='stack_detail')
-    
     # Related Blog Posts
     related_blog_posts = stack.blog_posts.filter(is_published=True).distinct()
 
@@ -545,7 +495,7 @@ def search(request):
                 tool_ids = SearchService.search(query, collection_name='tools')
                 if tool_ids:
                     from django.utils import timezone
-                    from django.db.models import Count, Q, BooleanField
+                    from django.db.models import BooleanField
                     
                     today = timezone.now().date()
                     
@@ -567,13 +517,11 @@ def search(request):
                             default=False,
                             output_field=BooleanField()
                         ),
-                        # Count affiliate clicks for conversion ranking
-                        conversion_count=Count('affiliate_clicks', distinct=True),
                         # Preserve semantic relevance from vector search
                         semantic_rank=preserved
-                    ).prefetch_related('translations').order_by(
+                    ).prefetch_related(Tool.prefetch_translations()).order_by(
                         '-is_highlighted',      # Highlighted tools first
-                        '-conversion_count',     # Then by conversion performance
+                        '-popularity',          # Then by (decayed) views, clicks and saves
                         'semantic_rank'          # Then by semantic relevance
                     )[:12]  # Increased from 9 to 12 results
                 else:
@@ -638,7 +586,7 @@ def search(request):
                     Q(name__icontains=query) |
                     Q(translations__short_description__icontains=query) |
                     Q(translations__use_cases__icontains=query)
-                ).distinct().prefetch_related('translations', 'tags')[:20]
+                ).distinct().order_by('-is_featured', '-popularity').prefetch_related(Tool.prefetch_translations(), 'tags')[:20]
                 stacks_results = []
                 
                 # Fallback profession search
@@ -690,18 +638,20 @@ def search(request):
 
 
 
+@cache_anonymous_page(Tool)
 def tag_detail(request, slug):
     """List tools by tag."""
     tag = get_object_or_404(Tag, slug=slug)
     tools = Tool.objects.filter(
         status='published',
         tags=tag
-    ).prefetch_related('translations', 'tags')
+    ).prefetch_related(Tool.prefetch_translations(), 'tags').order_by('-is_featured', '-created_at', '-id')
     
-    return render(request, 'tag_detail.html', {
+    listing = get_listing(request, 'tag', tools, 'includes/listing/_tool.html',
+                          counts=lambda: aggregate_counts(tools))
+    return render_listing(request, 'tag_detail.html', {
         'tag': tag,
-        'tools': tools,
-    })
+    }, listing)
 
 
 @login_required
@@ -736,6 +686,8 @@ def toggle_save_tool(request, tool_id):
     else:
         is_saved = True
         message = "Tool added to favorites."
+    AnalyticsService.count_tool_save(tool.id, is_saved)
+    mark_saved(request, tool, is_saved)
         
     # Return JSON for both HTMX and Fetch/AJAX
     if request.headers.get('HX-Request') or request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.headers.get('Accept', ''):
@@ -759,6 +711,7 @@ def toggle_save_stack(request, stack_slug):
     else:
         is_saved = True
         message = "Stack added to favorites."
+    mark_saved(request, stack, is_saved)
 
     # Return JSON for both HTMX and Fetch/AJAX
     if request.headers.get('HX-Request') or request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.headers.get('Accept', ''):
@@ -925,6 +878,8 @@ def delete_custom_stack(request, slug):
 @staff_member_required
 def admin_dashboard(request):
     """Analytics dashboard for superusers only."""
+    from .analytics_export import get_export_tables
+
     if not request.user.is_superuser:
         messages.error(request, "Access denied. Superuser required.")
         return redirect('home')
@@ -940,6 +895,9 @@ def admin_dashboard(request):
     # "Viewed Tools" (New metric)
     top_viewed_tools = AnalyticsService.get_top_viewed_tools(limit=10, days=days)
 
+    # All-time popularity from the denormalized Tool counters
+    popular_tools = AnalyticsService.get_popular_tools(limit=10)
+
     # "Viewed Stacks" (New metric using StackView)
     top_stacks = AnalyticsService.get_top_viewed_stacks_new(limit=10, days=days)
     
@@ -952,11 +910,9 @@ def admin_dashboard(request):
     # "Clicked Professions"
     top_clicked_professions = AnalyticsService.get_top_clicked_professions(limit=10, days=days)
     
-    # Pagination for recent searches
-    # Fetch more results to allow for deep scrolling (e.g. 1000) and paginate locally
-    # AnalyticsService.get_recent_searches returns a sliced queryset/list, so we use a large limit.
-    
-    recent_searches_list = AnalyticsService.get_recent_searches(limit=1000, days=days)
+    # Pagination for recent searches: the paginator slices the queryset in SQL;
+    # bulk downloads go through admin_export
+    recent_searches_list = AnalyticsService.get_recent_searches(limit=None, days=days)
     paginator = Paginator(recent_searches_list, 20) # Show 20 per page
     page_number = request.GET.get('page')
     recent_searches = paginator.get_page(page_number)
@@ -964,21 +920,13 @@ def admin_dashboard(request):
 
     search_stats = AnalyticsService.get_search_stats(days=days)
     click_stats = AnalyticsService.get_click_stats(days=days)
+    buffer_stats = AnalyticsService.get_buffer_stats()
+    dedupe_stats = AnalyticsService.get_dedupe_stats()
+    unique_visitors = AnalyticsService.get_site_unique_visitors(days=days)
     
     # Robot Analytics
     try:
-        from robots.models import RobotView
-        from django.db.models import Count
-        from datetime import timedelta, datetime
-        
-        cutoff_date = datetime.now()  - timedelta(days=days)
-        top_viewed_robots = RobotView.objects.filter(
-            created_at__gte=cutoff_date
-        ).values(
-            'robot__name', 'robot__slug', 'robot__image'
-        ).annotate(
-            view_count=Count('id')
-        ).order_by('-view_count')[:10]
+        top_viewed_robots = AnalyticsService.get_top_viewed_robots(limit=10, days=days)
     except Exception as e:
         print(f"Robot analytics failed: {e}")
         top_viewed_robots = []
@@ -1032,6 +980,8 @@ def admin_dashboard(request):
     return render(request, 'admin_dashboard.html', {
         'top_clicked_tools': top_clicked_tools,
         'top_viewed_tools': top_viewed_tools,
+        'popular_tools': popular_tools,
+        'export_tables': list(get_export_tables()),
         'top_stacks': top_stacks,
         'top_clicked_stacks': top_clicked_stacks,
         'top_professions': top_professions,
@@ -1040,6 +990,9 @@ def admin_dashboard(request):
         'recent_searches': recent_searches,
         'search_stats': search_stats,
         'click_stats': click_stats,
+        'buffer_stats': buffer_stats,
+        'dedupe_stats': dedupe_stats,
+        'unique_visitors': unique_visitors,
         'days': days,
         'newsletter_subscribers': newsletter_subscribers,
         'unresolved_reports': unresolved_reports,
@@ -1052,6 +1005,79 @@ def admin_dashboard(request):
     })
 
 
+@staff_member_required
+def admin_export(request, table):
+    """
+    Stream an analytics table or the newsletter subscribers as a download.
+    ?format=csv|jsonl  ?gzip=1  ?days=N (default: all rows)
+    """
+    from django.http import Http404, StreamingHttpResponse
+    from django.utils import timezone
+    from .analytics_export import EXPORT_FORMATS, export_filename, get_export_tables, iter_export
+
+    if not request.user.is_superuser:
+        messages.error(request, "Access denied. Superuser required.")
+        return redirect('home')
+    if table not in get_export_tables():
+        raise Http404("Unknown export table")
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        fmt = 'csv'
+    compress = request.GET.get('gzip') == '1'
+    try:
+        days = int(request.GET.get('days', 0))
+    except (ValueError, TypeError):
+        days = 0
+    start = timezone.now() - timezone.timedelta(days=days) if days > 0 else None
+
+    if compress:
+        content_type = 'application/gzip'
+    else:
+        content_type = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/x-ndjson; charset=utf-8'
+    response = StreamingHttpResponse(iter_export(table, fmt, start, compress=compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(table, fmt, compress)}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@staff_member_required
+def admin_content_gaps(request):
+    """Admin: search intent clusters, worst zero-result rates first (filled by cluster_searches)."""
+    from django.db.models import ExpressionWrapper, F, FloatField
+    from .models import JobCheckpoint, SearchCluster
+    from .search_clusters import CHECKPOINT_NAME
+
+    sort = request.GET.get('sort', 'zero')
+    try:
+        min_searches = max(int(request.GET.get('min', 3)), 1)
+    except (ValueError, TypeError):
+        min_searches = 3
+
+    clusters = SearchCluster.objects.filter(search_count__gte=min_searches).defer('centroid').annotate(
+        ctr=ExpressionWrapper(F('click_count') * 1.0 / F('search_count'), output_field=FloatField()),
+    )
+    if sort == 'searches':
+        clusters = clusters.order_by('-search_count')
+    elif sort == 'ctr':
+        clusters = clusters.order_by('ctr', '-search_count')
+    elif sort == 'recent':
+        clusters = clusters.order_by('-last_seen')
+    else:
+        sort = 'zero'
+        clusters = clusters.order_by('-zero_result_count', '-search_count')
+
+    paginator = Paginator(clusters, 50)
+    clusters_page = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'admin_content_gaps.html', {
+        'clusters': clusters_page,
+        'sort': sort,
+        'min_searches': min_searches,
+        'checkpoint': JobCheckpoint.objects.filter(name=CHECKPOINT_NAME).first(),
+        'active_tab': 'content_gaps',
+    })
+
+
 # --- Admin Tool Management ---
 
 @staff_member_required
@@ -1568,8 +1594,8 @@ def bulk_upload_tools(request):
                     continue
                 
                 try:
-                    # Generate metadata via AI
-                    metadata = AIService.generate_tool_metadata(
+                    # Taxonomy via local classifier, Gemini only when it is unsure
+                    metadata = AIService.suggest_tool_metadata(
                         tool_name=row['tool_name'],
                         website_url=row['website_url'],
                         short_description=row['short_description'],
@@ -1676,6 +1702,8 @@ def bulk_upload_tools(request):
                     row['tool_id'] = tool.id
                     row['tool_slug'] = tool.slug
                     row['similar_tools'] = similar_tool_names  # Store for display
+                    row['metadata_source'] = metadata.get('source')
+                    row['confidence'] = metadata.get('confidence')
                     created_count += 1
                     
                 except Exception as e:
@@ -1694,6 +1722,7 @@ def bulk_upload_tools(request):
             context['created'] = created_count
             context['skipped'] = skipped_count
             context['errors'] = error_count
+            context['classified'] = sum(1 for r in results if r.get('metadata_source') == 'classifier')
     
     return render(request, 'admin_bulk_upload.html', context)
 
@@ -2082,46 +2111,21 @@ def api_process_webcheck_tool(request, tool_id):
 
 def get_active_notifications(request):
     """API endpoint to fetch active notifications for the current user."""
-    from .models import Notification
-    
-    # Start with active notifications
-    notifications = Notification.objects.filter(is_active=True)
-    
-    # Filter by visibility based on authentication status
-    if request.user.is_authenticated:
-        # Show both public and auth_only notifications
-        notifications = notifications.filter(
-            Q(visibility='public') | Q(visibility='auth_only')
-        )
+    # Public and auth_only variants are cached separately (tools/notifications.py)
+    authenticated = request.user.is_authenticated
+    payload = get_notifications_payload('auth_only' if authenticated else 'public')
+
+    response = get_conditional_response(request, etag=payload['etag'])
+    if response is None:
+        response = HttpResponse(payload['body'], content_type='application/json')
+    response['ETag'] = payload['etag']
+    # The body depends on the session: shared caches may only store the anonymous variant
+    if authenticated:
+        patch_cache_control(response, private=True, max_age=settings.NOTIFICATIONS_MAX_AGE)
     else:
-        # Show only public notifications
-        notifications = notifications.filter(visibility='public')
-    
-    # Order: permanent first, then by priority (desc), then by created_at (desc)
-    # The model already has this ordering, but we'll be explicit
-    notifications = notifications.order_by('-notification_type', '-priority', '-created_at')
-    
-    # Serialize to JSON
-    data = []
-    for n in notifications:
-        youtube_id = None
-        if n.youtube_url:
-            # Simple extraction for common YouTube URL formats
-            if 'v=' in n.youtube_url:
-                youtube_id = n.youtube_url.split('v=')[1].split('&')[0]
-            elif 'youtu.be/' in n.youtube_url:
-                youtube_id = n.youtube_url.split('youtu.be/')[1].split('?')[0]
-                
-        data.append({
-            'id': n.id,
-            'title': n.title,
-            'content': n.content,
-            'notification_type': n.notification_type,
-            'priority': n.priority,
-            'youtube_id': youtube_id
-        })
-    
-    return JsonResponse({'notifications': data})
+        patch_cache_control(response, public=True, max_age=settings.NOTIFICATIONS_MAX_AGE)
+    patch_vary_headers(response, ['Cookie'])
+    return response
 
 
 @staff_member_required